@@ -0,0 +1,44 @@
+import json
+import argparse
+
+from typing import Dict
+
+
+COLUMNS = (("p50", ("latency_ms", "p50")), ("p95", ("latency_ms", "p95")), ("p99", ("latency_ms", "p99")),
+           ("rps", ("throughput_rps",)), ("db/req", ("db", "statements_per_request")))
+
+
+def lookup(entry: dict, path: tuple) -> float:
+    for key in path:
+        entry = entry.get(key, {}) if isinstance(entry, dict) else {}
+    return entry if isinstance(entry, (int, float)) else 0.0
+
+
+def change(before: float, after: float) -> str:
+    if not before:
+        return f"{after:g}"
+    return f"{after:g} ({(after - before) / before * 100:+.1f}%)"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Diff two benchmarks.load reports endpoint by endpoint.")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    arguments = parser.parse_args()
+
+    with open(arguments.before) as file:
+        before: Dict[str, dict] = json.load(file)
+    with open(arguments.after) as file:
+        after: Dict[str, dict] = json.load(file)
+
+    rows = [("total", before["total"], after["total"])]
+    for endpoint in sorted(set(before["endpoints"]) | set(after["endpoints"])):
+        rows.append((endpoint, before["endpoints"].get(endpoint, {}), after["endpoints"].get(endpoint, {})))
+
+    for name, old, new in rows:
+        cells = [f"{column}={change(lookup(old, path), lookup(new, path))}" for column, path in COLUMNS]
+        print(f"{name:<32} " + "  ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+import re
+import json
+import math
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import platform
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+import httpx
+
+from benchmarks.seed import DEFAULT_PASSWORD, DEFAULT_PREFIX, username_for
+
+
+DEFAULT_MIX = "login=5,get_lists=20,get_todos=35,get_todo=20,create_todo=15,create_list=3,signup=2"
+
+METRIC_PATTERN = re.compile(r'^(http_request_db_statements|http_request_db_duration_seconds)_(sum|count)'
+                            r'\{method="([^"]*)",route="([^"]*)"\} (\S+)$')
+
+
+@dataclass
+class Session:
+    username: str
+    headers: Dict[str, str]
+    list_ids: List[int] = field(default_factory=list)
+    todo_ids: List[int] = field(default_factory=list)
+
+
+@dataclass
+class Sample:
+    endpoint: str
+    status: str
+    latency: float
+
+
+class LoadGenerator:
+
+    def __init__(self, client: httpx.AsyncClient, sessions: List[Session], password: str, random_seed: int) -> None:
+        self.client: httpx.AsyncClient = client
+        self.sessions: List[Session] = sessions
+        self.password: str = password
+        self.random = random.Random(random_seed)
+        self.run_id: str = uuid.uuid4().hex[:8]
+        self.counter: int = 0
+
+        self.operations: Dict[str, Tuple[str, Callable[[], Awaitable[httpx.Response]]]] = {
+            "signup": ("POST /users/signup", self.signup),
+            "login": ("POST /users/login", self.login),
+            "get_lists": ("GET /users/{user_id}/lists", self.get_lists),
+            "get_todos": ("GET /lists/{list_id}/todos", self.get_todos),
+            "get_todo": ("GET /todos/{todo_id}", self.get_todo),
+            "create_list": ("POST /lists", self.create_list),
+            "create_todo": ("POST /todos", self.create_todo)
+        }
+
+    def unique(self) -> str:
+        self.counter += 1
+        return f"{self.run_id}-{self.counter}"
+
+    def session(self) -> Session:
+        return self.random.choice(self.sessions)
+
+    async def signup(self) -> httpx.Response:
+        username = f"load-{self.unique()}"
+        return await self.client.post("/users/signup", params={
+            "username": username, "password": self.password, "email": f"{username}@example.com", "name": username
+        })
+
+    async def login(self) -> httpx.Response:
+        return await self.client.post("/users/login", data={
+            "username": self.session().username, "password": self.password
+        })
+
+    async def get_lists(self) -> httpx.Response:
+        session = self.session()
+        return await self.client.get(f"/users/{session.username}/lists", headers=session.headers)
+
+    async def get_todos(self) -> httpx.Response:
+        session = self.session()
+        return await self.client.get(f"/lists/{self.random.choice(session.list_ids)}/todos", headers=session.headers)
+
+    async def get_todo(self) -> httpx.Response:
+        session = self.session()
+        return await self.client.get(f"/todos/{self.random.choice(session.todo_ids)}", headers=session.headers)
+
+    async def create_list(self) -> httpx.Response:
+        session = self.session()
+        return await self.client.post("/lists", params={"name": f"load-{self.unique()}", "user_id": session.username},
+                                      headers=session.headers)
+
+    async def create_todo(self) -> httpx.Response:
+        session = self.session()
+        return await self.client.post("/todos", params={
+            "list_id": self.random.choice(session.list_ids), "title": f"load-{self.unique()}",
+            "description": "Load test to-do"
+        }, headers=session.headers)
+
+
+async def open_sessions(client: httpx.AsyncClient, prefix: str, count: int, password: str) -> List[Session]:
+    sessions = []
+    for index in range(count):
+        username = username_for(prefix, index)
+        response = await client.post("/users/login", data={"username": username, "password": password})
+        if response.status_code != 200:
+            raise SystemExit(f"Could not log in as {username} ({response.status_code}), run benchmarks.seed first")
+
+        session = Session(username, {"Authorization": f"Bearer {response.json()['access_token']}"})
+        response = await client.get(f"/users/{username}/lists", headers=session.headers)
+        session.list_ids = [todo_list["id"] for todo_list in response.json()]
+
+        for list_id in session.list_ids[:3]:
+            response = await client.get(f"/lists/{list_id}/todos", headers=session.headers)
+            if response.status_code == 200:
+                session.todo_ids.extend(todo["id"] for todo in response.json())
+
+        if session.list_ids and session.todo_ids:
+            sessions.append(session)
+
+    if not sessions:
+        raise SystemExit("No seeded user has lists with to-dos, run benchmarks.seed first")
+    return sessions
+
+
+async def scrape_db_metrics(client: httpx.AsyncClient) -> Dict[str, Dict[str, float]]:
+    response = await client.get("/metrics")
+    metrics: Dict[str, Dict[str, float]] = defaultdict(dict)
+
+    for line in response.text.splitlines():
+        match = METRIC_PATTERN.match(line)
+        if match:
+            name, kind, method, route, value = match.groups()
+            metrics[f"{method} {route}"][f"{name}_{kind}"] = float(value)
+
+    return metrics
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for entry in mix.split(","):
+        name, _, weight = entry.partition("=")
+        weights[name.strip()] = float(weight)
+    return weights
+
+
+def percentile(values: List[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(percent / 100 * len(values)) - 1)]
+
+
+def summarize(samples: List[Sample], elapsed: float) -> dict:
+    latencies = sorted(sample.latency for sample in samples)
+    statuses = Counter(sample.status for sample in samples)
+    errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "statuses": dict(sorted(statuses.items())),
+        "throughput_rps": round(len(samples) / elapsed, 3) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p95": round(percentile(latencies, 95) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3) if latencies else 0.0
+        }
+    }
+
+
+def db_delta(before: Dict[str, float], after: Dict[str, float]) -> dict:
+    requests = after.get("http_request_db_statements_count", 0) - before.get("http_request_db_statements_count", 0)
+    statements = after.get("http_request_db_statements_sum", 0) - before.get("http_request_db_statements_sum", 0)
+    seconds = (after.get("http_request_db_duration_seconds_sum", 0)
+               - before.get("http_request_db_duration_seconds_sum", 0))
+
+    return {
+        "statements": int(statements),
+        "statements_per_request": round(statements / requests, 3) if requests else 0.0,
+        "ms_per_request": round(seconds / requests * 1000, 3) if requests else 0.0
+    }
+
+
+async def run_load(client: httpx.AsyncClient, arguments: argparse.Namespace) -> dict:
+    sessions = await open_sessions(client, arguments.prefix, arguments.sessions, arguments.password)
+    generator = LoadGenerator(client, sessions, arguments.password, arguments.seed)
+
+    weights = parse_mix(arguments.mix)
+    unknown = set(weights) - set(generator.operations)
+    if unknown:
+        raise SystemExit(f"Unknown operations in --mix: {', '.join(sorted(unknown))}")
+    names = list(weights)
+    schedule = generator.random.choices(names, weights=[weights[name] for name in names],
+                                        k=int(arguments.rps * arguments.duration))
+
+    samples: List[Sample] = []
+    semaphore = asyncio.Semaphore(arguments.concurrency)
+    loop = asyncio.get_running_loop()
+
+    async def issue(name: str, scheduled: float) -> None:
+        endpoint, operation = generator.operations[name]
+        async with semaphore:
+            try:
+                status = str((await operation()).status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+        samples.append(Sample(endpoint, status, loop.time() - scheduled))
+
+    metrics_before = await scrape_db_metrics(client)
+
+    start = loop.time()
+    tasks = []
+    for index, name in enumerate(schedule):
+        scheduled = start + index / arguments.rps
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(issue(name, scheduled)))
+
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - start
+
+    metrics_after = await scrape_db_metrics(client)
+
+    by_endpoint: Dict[str, List[Sample]] = defaultdict(list)
+    for sample in samples:
+        by_endpoint[sample.endpoint].append(sample)
+
+    return {
+        "config": {
+            "target_rps": arguments.rps,
+            "duration": arguments.duration,
+            "concurrency": arguments.concurrency,
+            "sessions": len(sessions),
+            "mix": weights,
+            "seed": arguments.seed,
+            "target": arguments.url or "in-process",
+            "python": platform.python_version(),
+            "latency_from": "scheduled start"
+        },
+        "total": {**summarize(samples, elapsed), "elapsed_seconds": round(elapsed, 3)},
+        "endpoints": {
+            endpoint: {
+                **summarize(endpoint_samples, elapsed),
+                "db": db_delta(metrics_before.get(endpoint, {}), metrics_after.get(endpoint, {}))
+            }
+            for endpoint, endpoint_samples in sorted(by_endpoint.items())
+        }
+    }
+
+
+async def main_async(arguments: argparse.Namespace) -> dict:
+    timeout = httpx.Timeout(arguments.timeout)
+    limits = httpx.Limits(max_connections=arguments.concurrency)
+
+    if arguments.url:
+        async with httpx.AsyncClient(base_url=arguments.url, timeout=timeout, limits=limits) as client:
+            return await run_load(client, arguments)
+
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=timeout) as client:
+            return await run_load(client, arguments)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Drive the API at a target request rate and report latencies.")
+    parser.add_argument("--url", help="base url of a running server, the app is served in-process when omitted")
+    parser.add_argument("--rps", type=float, default=50, help="target requests per second (open loop)")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to generate load for")
+    parser.add_argument("--concurrency", type=int, default=64, help="maximum requests in flight")
+    parser.add_argument("--sessions", type=int, default=20, help="seeded users to log in and spread load across")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="operation weights, e.g. get_todos=3,create_todo=1")
+    parser.add_argument("--prefix", default=DEFAULT_PREFIX, help="username prefix used by benchmarks.seed")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the operation schedule")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    arguments = parser.parse_args()
+
+    started_at = time.time()
+    report = asyncio.run(main_async(arguments))
+    report["config"]["started_at"] = started_at
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import json
+import time
+import random
+import argparse
+
+from typing import Dict, List
+
+from sqlalchemy import delete, func, insert, select, update
+
+from config.database import Session, migrate_data_base
+
+from models.user import User as UserModel
+from models.list import TodoList as TodoListModel
+from models.todo import Todo as TodoModel
+
+from utils.hash_handler import get_hash
+
+
+SEED_CHUNK_SIZE = 5000
+DEFAULT_PREFIX = "bench"
+DEFAULT_PASSWORD = "benchmark"
+
+
+def username_for(prefix: str, index: int) -> str:
+    return f"{prefix}{index}"
+
+
+def reset(db: Session, prefix: str) -> None:
+    pattern = f"{prefix}%"
+    list_ids = select(TodoListModel.id).join(UserModel).where(UserModel.username.like(pattern))
+    db.execute(delete(TodoModel).where(TodoModel.list_id.in_(list_ids)))
+    db.execute(delete(TodoListModel).where(TodoListModel.user_id.like(pattern)))
+    db.execute(delete(UserModel).where(UserModel.username.like(pattern)))
+    db.commit()
+
+
+def insert_chunked(db: Session, model, rows: List[dict]) -> None:
+    for start in range(0, len(rows), SEED_CHUNK_SIZE):
+        db.execute(insert(model), rows[start:start + SEED_CHUNK_SIZE])
+
+
+def refresh_list_counters(db: Session, prefix: str) -> None:
+    todos = select(func.count(TodoModel.id)).where(TodoModel.list_id == TodoListModel.id)
+    completed = todos.where(TodoModel.completed.is_(True))
+    db.execute(
+        update(TodoListModel).where(TodoListModel.user_id.like(f"{prefix}%"))
+        .values(todo_count=todos.scalar_subquery(), completed_count=completed.scalar_subquery())
+    )
+
+
+def seed(db: Session, users: int, lists_per_user: int, todos_per_list: int, prefix: str = DEFAULT_PREFIX,
+         password: str = DEFAULT_PASSWORD, random_seed: int = 0) -> Dict[str, int]:
+    generator = random.Random(random_seed)
+    password_hash = get_hash(password)
+
+    usernames = [username_for(prefix, index) for index in range(users)]
+    insert_chunked(db, UserModel, [
+        {"username": username, "email": f"{username}@example.com", "name": f"Benchmark user {index}",
+         "password_hash": password_hash}
+        for index, username in enumerate(usernames)
+    ])
+
+    list_rows = [
+        {"name": f"{username}-list{index}", "user_id": username}
+        for username in usernames for index in range(lists_per_user)
+    ]
+    list_ids: List[int] = []
+    for start in range(0, len(list_rows), SEED_CHUNK_SIZE):
+        statement = insert(TodoListModel).returning(TodoListModel.id)
+        list_ids.extend(db.scalars(statement, list_rows[start:start + SEED_CHUNK_SIZE]).all())
+
+    todos = 0
+    rows: List[dict] = []
+    for list_id in list_ids:
+        for index in range(todos_per_list):
+            rows.append({"list_id": list_id, "title": f"todo{index}", "description": f"Benchmark to-do {index}",
+                         "completed": generator.random() < 0.5})
+            if len(rows) >= SEED_CHUNK_SIZE:
+                insert_chunked(db, TodoModel, rows)
+                todos += len(rows)
+                rows = []
+    insert_chunked(db, TodoModel, rows)
+    todos += len(rows)
+
+    refresh_list_counters(db, prefix)
+    db.commit()
+    return {"users": len(usernames), "lists": len(list_ids), "todos": todos}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Seed the configured database with a synthetic dataset.")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--lists-per-user", type=int, default=10)
+    parser.add_argument("--todos-per-list", type=int, default=50)
+    parser.add_argument("--prefix", default=DEFAULT_PREFIX, help="username prefix of the seeded users")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="password shared by every seeded user")
+    parser.add_argument("--seed", type=int, default=0, help="random seed, for reproducible datasets")
+    parser.add_argument("--reset", action="store_true", help="delete users with the prefix before seeding")
+    arguments = parser.parse_args()
+
+    migrate_data_base()
+
+    start = time.perf_counter()
+    db = Session()
+    try:
+        if arguments.reset:
+            reset(db, arguments.prefix)
+        counts = seed(db, arguments.users, arguments.lists_per_user, arguments.todos_per_list, arguments.prefix,
+                      arguments.password, arguments.seed)
+    finally:
+        db.close()
+
+    print(json.dumps({**counts, "seconds": round(time.perf_counter() - start, 3)}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import sys
+import json
+import time
+import argparse
+import datetime
+
+from typing import Callable, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+# Registers the User and TodoList mappers that Todo's relationships resolve by name.
+import models.user
+import models.list  # noqa: F401
+from models.todo import Todo as TodoModel
+
+from utils.responses import todos_serializer
+
+
+def build_todos(count: int) -> List[TodoModel]:
+    now = datetime.datetime(2023, 8, 15, 10, 44)
+    return [
+        TodoModel(id=index + 1, list_id=1, title=f"To-do {index}", description="Ya comienza el ciclo " * 5,
+                  completed=index % 2 == 0, registration_time=now + datetime.timedelta(seconds=index))
+        for index in range(count)
+    ]
+
+
+def best_of(function: Callable[[], bytes], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-item serialization cost of GET /lists/{list_id}/todos.")
+    parser.add_argument("--count", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    arguments = parser.parse_args()
+
+    todos = build_todos(arguments.count)
+
+    def before() -> bytes:
+        return JSONResponse(content=jsonable_encoder(todos)).body
+
+    def after() -> bytes:
+        return todos_serializer.dump(todos)
+
+    if json.loads(before()) != json.loads(after()):
+        sys.exit("serializers disagree on the payload")
+
+    results = {}
+    for name, function in (("jsonable_encoder+JSONResponse", before), ("TypeAdapter.dump_json", after)):
+        elapsed = best_of(function, arguments.repeat)
+        results[name] = {
+            "total_ms": round(elapsed * 1000, 3),
+            "per_item_us": round(elapsed / arguments.count * 1_000_000, 3)
+        }
+
+    print(json.dumps({"count": arguments.count, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+from typing import Dict, List
+
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+app = main.create_app()
+created = time.perf_counter()
+result = {"import_ms": (imported - start) * 1000, "create_app_ms": (created - imported) * 1000}
+if sys.argv[1] == "lifespan":
+    import asyncio
+
+    async def run_lifespan():
+        async with app.router.lifespan_context(app):
+            return (time.perf_counter() - created) * 1000
+
+    result["lifespan_ms"] = asyncio.run(run_lifespan())
+print(json.dumps(result))
+"""
+
+
+def probe(lifespan: bool) -> Dict[str, float]:
+    output = subprocess.run([sys.executable, "-c", PROBE, "lifespan" if lifespan else "app"], check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def slowest_imports(top: int) -> List[Dict[str, float | str]]:
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], check=True,
+                            capture_output=True, text=True).stderr
+
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        modules.append({"module": name.strip(), "own_ms": int(own.split(":")[1]) / 1000,
+                        "cumulative_ms": int(cumulative) / 1000})
+
+    return sorted(modules, key=lambda module: module["own_ms"], reverse=True)[:top]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        "median": round(statistics.median(samples), 2),
+        "min": round(min(samples), 2),
+        "max": round(max(samples), 2)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure cold start: importing main, create_app and the lifespan.")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to measure")
+    parser.add_argument("--budget-ms", type=float, default=2500, help="fail when the median import exceeds this")
+    parser.add_argument("--lifespan", action="store_true", help="also run migrations and warmup against the db")
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list, by their own import time")
+    arguments = parser.parse_args()
+
+    samples = [probe(arguments.lifespan) for _ in range(arguments.runs)]
+    report = {name: summarize([sample[name] for sample in samples]) for name in samples[0]}
+    report["budget_ms"] = arguments.budget_ms
+    report["slowest_imports"] = slowest_imports(arguments.top)
+
+    print(json.dumps(report, indent=2))
+
+    if report["import_ms"]["median"] > arguments.budget_ms:
+        sys.exit(f"median import time {report['import_ms']['median']}ms is over the {arguments.budget_ms}ms budget")
+
+
+if __name__ == "__main__":
+    main()
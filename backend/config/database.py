@@ -1,25 +1,126 @@
+import threading
+
 from dotenv import dotenv_values
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine
 from sqlalchemy.orm.session import sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
+
+from config.engine import pool_statistics, warm_up_pool
+from config.settings import Settings
+
+from utils.metrics import CallbackGauge, registry, instrument_engine
+
+
+class Database:
+
+    def __init__(self, settings: Settings | None = None) -> None:
+        self._settings: Settings | None = settings
+        self.lock = threading.RLock()
+        self._engine: Engine | None = None
+        self._async_engine: AsyncEngine | None = None
+
+    @property
+    def settings(self) -> Settings:
+        if self._settings is None:
+            with self.lock:
+                if self._settings is None:
+                    self._settings = Settings.from_secrets(dotenv_values("./config/.env"))
+        return self._settings
+
+    def configure(self, settings: Settings) -> None:
+        with self.lock:
+            if self._engine is not None or self._async_engine is not None:
+                changed = (settings.database_url, settings.engine) != (self._settings.database_url,
+                                                                       self._settings.engine)
+                if changed:
+                    raise RuntimeError("The database engines were already created with other settings")
+            self._settings = settings
+
+    @property
+    def engine(self) -> Engine:
+        return self.get_engine()
+
+    @property
+    def async_engine(self) -> AsyncEngine:
+        return self.get_async_engine()
+
+    def get_engine(self) -> Engine:
+        if self._engine is None:
+            with self.lock:
+                if self._engine is None:
+                    engine = create_engine(self.settings.database_url,
+                                           **self.settings.engine.engine_options(self.settings.driver))
+                    instrument_engine(engine, "sync")
+                    Session.configure(bind=engine)
+                    self._engine = engine
+        return self._engine
+
+    def get_async_engine(self) -> AsyncEngine:
+        if self._async_engine is None:
+            with self.lock:
+                if self._async_engine is None:
+                    async_engine = create_async_engine(self.settings.async_database_url,
+                                                       **self.settings.engine.engine_options(
+                                                           self.settings.async_driver))
+                    instrument_engine(async_engine.sync_engine, "async")
+                    AsyncSession.configure(bind=async_engine)
+                    self._async_engine = async_engine
+        return self._async_engine
+
+    def engines(self) -> dict:
+        engines = {"sync": self._engine, "async": self._async_engine}
+        return {name: engine for name, engine in engines.items() if engine is not None}
+
+    def reset(self) -> None:
+        with self.lock:
+            if self._async_engine is not None:
+                self._async_engine.sync_engine.dispose(close=False)
+            if self._engine is not None:
+                self._engine.dispose()
+            self._engine = self._async_engine = None
+            Session.configure(bind=None)
+            AsyncSession.configure(bind=None)
+
+    async def dispose(self) -> None:
+        if self._async_engine is not None:
+            await self._async_engine.dispose()
+        if self._engine is not None:
+            self._engine.dispose()
+
+
+class LazySessionmaker(sessionmaker):
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            database.get_engine()
+        return super().__call__(**local_kw)
 
-secrets = dotenv_values("./config/.env")
 
-user = secrets['USERNAME']
-password = secrets['PASSWORD']
-host = secrets['HOST']
-port = secrets['PORT']
-database = secrets['DATABASE']
+class LazyAsyncSessionmaker(async_sessionmaker):
 
-database_url = f"postgresql://{user}:{password}@{host}:{port}/{database}"
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            database.get_async_engine()
+        return super().__call__(**local_kw)
 
-engine = create_engine(database_url, echo=True)
 
-Session = sessionmaker(bind=engine)
+database = Database()
+
+Session = LazySessionmaker()
+AsyncSession = LazyAsyncSessionmaker(expire_on_commit=False)
 
 Base = declarative_base()
 
 
+def __getattr__(name: str):
+    if name in ("engine", "async_engine"):
+        return getattr(database, name)
+    if name in ("database_url", "async_database_url"):
+        return getattr(database.settings, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def get_db() -> Session:
     db = Session()
     try:
@@ -28,5 +129,35 @@ def get_db() -> Session:
         db.close()
 
 
+async def get_async_db() -> AsyncSession:
+    async with AsyncSession() as db:
+        yield db
+
+
 def create_data_base_models() -> None:
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=database.engine)
+
+
+def migrate_data_base(revision: str = "head") -> None:
+    from alembic import command
+    from alembic.config import Config
+
+    command.upgrade(Config("./alembic.ini"), revision)
+
+
+async def warm_up_database() -> None:
+    await warm_up_pool(database.async_engine, database.settings.engine.pool_min_size)
+
+
+def get_pool_statistics() -> dict:
+    return {name: pool_statistics(engine.pool) for name, engine in database.engines().items()}
+
+
+def collect_pool_connections():
+    for name, statistics in get_pool_statistics().items():
+        for state in ("checked_out", "idle", "overflow"):
+            yield (name, state), statistics[state]
+
+
+registry.register(CallbackGauge("db_pool_connections", "Connections in the pool, by engine and state.",
+                                ("engine", "state"), collect_pool_connections))
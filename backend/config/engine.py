@@ -0,0 +1,137 @@
+import os
+import time
+import asyncio
+import threading
+
+from dataclasses import dataclass, replace
+from typing import Dict
+
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+def read_setting(secrets: Dict[str, str | None], name: str, default: str) -> str:
+    value = os.environ.get(name)
+    if value is None:
+        value = secrets.get(name)
+    return default if value is None or value == "" else value
+
+
+def read_flag(secrets: Dict[str, str | None], name: str, default: bool) -> bool:
+    return read_setting(secrets, name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass(frozen=True)
+class EngineSettings:
+    pool_size: int
+    max_overflow: int
+    pool_timeout: float
+    pool_recycle: int
+    pool_pre_ping: bool
+    pool_min_size: int
+    statement_timeout: int
+    echo: bool
+
+    @classmethod
+    def from_secrets(cls, secrets: Dict[str, str | None]) -> "EngineSettings":
+        pool_size = int(read_setting(secrets, "DB_POOL_SIZE", "5"))
+        return cls(
+            pool_size=pool_size,
+            max_overflow=int(read_setting(secrets, "DB_MAX_OVERFLOW", "10")),
+            pool_timeout=float(read_setting(secrets, "DB_POOL_TIMEOUT", "30")),
+            pool_recycle=int(read_setting(secrets, "DB_POOL_RECYCLE", "1800")),
+            pool_pre_ping=read_flag(secrets, "DB_POOL_PRE_PING", True),
+            pool_min_size=min(int(read_setting(secrets, "DB_POOL_MIN_SIZE", "1")), pool_size),
+            statement_timeout=int(read_setting(secrets, "DB_STATEMENT_TIMEOUT", "0")),
+            echo=read_flag(secrets, "DB_ECHO", False)
+        )
+
+    def for_budget(self, connections: int, engines: int = 2) -> "EngineSettings":
+        per_engine = max(connections // engines, 1)
+        pool_size = min(self.pool_size, per_engine)
+        return replace(self, pool_size=pool_size, max_overflow=min(self.max_overflow, per_engine - pool_size),
+                       pool_min_size=min(self.pool_min_size, pool_size))
+
+    def engine_options(self, driver: str) -> dict:
+        options = {
+            "echo": self.echo,
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.pool_timeout,
+            "pool_recycle": self.pool_recycle,
+            "pool_pre_ping": self.pool_pre_ping,
+            "poolclass": TimedAsyncAdaptedQueuePool if driver in ("asyncpg", "aiosqlite") else TimedQueuePool
+        }
+
+        if self.statement_timeout > 0:
+            if driver == "asyncpg":
+                options["connect_args"] = {"server_settings": {"statement_timeout": str(self.statement_timeout)}}
+            elif driver == "psycopg2":
+                options["connect_args"] = {"options": f"-c statement_timeout={self.statement_timeout}"}
+
+        return options
+
+
+class PoolWaitStatistics:
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+
+    def record(self, elapsed: float) -> None:
+        with self.lock:
+            self.count += 1
+            self.total += elapsed
+            self.max = max(self.max, elapsed)
+
+
+class TimedPoolMixin:
+
+    wait_statistics: PoolWaitStatistics
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.wait_statistics = PoolWaitStatistics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.wait_statistics.record(time.perf_counter() - start)
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_statistics(pool: QueuePool) -> dict:
+    statistics = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0)
+    }
+
+    wait_statistics: PoolWaitStatistics | None = getattr(pool, "wait_statistics", None)
+    if wait_statistics is not None:
+        statistics["wait_count"] = wait_statistics.count
+        statistics["wait_seconds_total"] = wait_statistics.total
+        statistics["wait_seconds_max"] = wait_statistics.max
+
+    return statistics
+
+
+async def warm_up_pool(engine: AsyncEngine, size: int) -> None:
+    if size <= 0:
+        return
+
+    connections = await asyncio.gather(*(engine.connect() for _ in range(size)))
+    for connection in connections:
+        await connection.close()
@@ -0,0 +1,203 @@
+import time
+import asyncio
+import logging
+import itertools
+
+from contextvars import ContextVar
+from typing import Dict, List
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session as OrmSession
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
+
+from config.database import database, AsyncSession
+from config.engine import pool_statistics
+from config.settings import ReplicaSettings
+
+from utils.jwt_handler import encode_jwt, decode_jwt
+from utils.metrics import instrument_engine
+from utils.ttl_cache import TTLCache
+
+
+logger = logging.getLogger(__name__)
+
+STICKY_COOKIE = "replica_sticky"
+
+request_writer: ContextVar[Dict[str, str] | None] = ContextVar("request_writer", default=None)
+
+POSTGRES_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_is_in_recovery() "
+    "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) ELSE 0 END"
+)
+
+
+class Replica:
+
+    def __init__(self, name: str, url: str) -> None:
+        self.name: str = name
+        self.url: str = url
+        self._engine: AsyncEngine | None = None
+        self.sessionmaker: async_sessionmaker | None = None
+        self.healthy: bool = True
+        self.lag: float = 0.0
+        self.failures: int = 0
+        self.last_error: str | None = None
+
+    @property
+    def engine(self) -> AsyncEngine:
+        return self.get_engine()
+
+    def get_engine(self) -> AsyncEngine:
+        if self._engine is None:
+            engine = create_async_engine(
+                self.url, **database.settings.engine.engine_options(make_url(self.url).get_driver_name())
+            )
+            instrument_engine(engine.sync_engine, self.name)
+            event.listen(engine.sync_engine, "handle_error", self.handle_error)
+            self.sessionmaker = async_sessionmaker(bind=engine, expire_on_commit=False)
+            self._engine = engine
+        return self._engine
+
+    def get_sessionmaker(self) -> async_sessionmaker:
+        if self.sessionmaker is None:
+            self.get_engine()
+        return self.sessionmaker
+
+    async def dispose(self) -> None:
+        if self._engine is not None:
+            await self._engine.dispose()
+
+    def handle_error(self, context) -> None:
+        if context.is_disconnect:
+            self.mark_unhealthy(str(context.original_exception))
+
+    def mark_unhealthy(self, error: str) -> None:
+        if self.healthy:
+            logger.warning("Replica %s marked unhealthy: %s", self.name, error)
+        self.healthy = False
+        self.failures += 1
+        self.last_error = error
+
+    async def probe(self) -> None:
+        async with self.engine.connect() as connection:
+            if self.engine.dialect.name == "postgresql":
+                self.lag = float(await connection.scalar(POSTGRES_LAG_QUERY))
+            else:
+                await connection.execute(text("SELECT 1"))
+
+    async def check(self, timeout: float, max_lag: float) -> None:
+        try:
+            await asyncio.wait_for(self.probe(), timeout)
+        except Exception as e:
+            self.mark_unhealthy(repr(e))
+            return
+
+        if self.lag > max_lag:
+            self.mark_unhealthy(f"Replication lag of {self.lag:.1f}s")
+            return
+
+        if not self.healthy:
+            logger.info("Replica %s is healthy again", self.name)
+        self.healthy = True
+        self.last_error = None
+
+    def statistics(self) -> dict:
+        return {
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            **(pool_statistics(self._engine.pool) if self._engine is not None else {})
+        }
+
+
+class ReplicaRouter:
+
+    def __init__(self, settings: ReplicaSettings) -> None:
+        self.settings: ReplicaSettings = settings
+        self.replicas: List[Replica] = [Replica(f"replica{index}", url) for index, url in enumerate(settings.urls)]
+        self.recent_writers = TTLCache(maxsize=100_000, ttl=settings.sticky_seconds)
+        self.cycle = itertools.cycle(self.replicas) if self.replicas else None
+        self.health_task: asyncio.Task | None = None
+        self.primary_reads: int = 0
+        self.replica_reads: int = 0
+
+    def configure(self, settings: ReplicaSettings) -> None:
+        if settings == self.settings:
+            return
+        if self.health_task is not None:
+            raise RuntimeError("The replica router cannot be reconfigured while it is running")
+        self.settings = settings
+        self.replicas = [Replica(f"replica{index}", url) for index, url in enumerate(settings.urls)]
+        self.recent_writers.configure(self.recent_writers.maxsize, settings.sticky_seconds)
+        self.cycle = itertools.cycle(self.replicas) if self.replicas else None
+
+    def mark_write(self, username: str) -> None:
+        self.recent_writers.set(username, time.monotonic())
+        writer = request_writer.get()
+        if writer is not None:
+            writer["username"] = username
+
+    def write_marker(self, username: str) -> str:
+        return encode_jwt({"writer": username, "expires": time.time() + self.recent_writers.ttl})
+
+    def is_sticky(self, username: str, marker: str | None = None) -> bool:
+        if self.recent_writers.get(username) is not None:
+            return True
+        return marker is not None and decode_jwt(marker).get("writer") == username
+
+    def choose(self) -> Replica | None:
+        for _ in range(len(self.replicas)):
+            replica = next(self.cycle)
+            if replica.healthy:
+                return replica
+        return None
+
+    def read_sessionmaker(self, username: str, marker: str | None = None) -> async_sessionmaker:
+        replica = self.choose() if self.replicas and not self.is_sticky(username, marker) else None
+        if replica is None:
+            self.primary_reads += 1
+            return AsyncSession
+        self.replica_reads += 1
+        return replica.get_sessionmaker()
+
+    async def check(self) -> None:
+        await asyncio.gather(*(replica.check(self.settings.health_timeout, self.settings.max_lag)
+                               for replica in self.replicas))
+
+    async def run_health_checks(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.settings.health_interval)
+
+    async def start(self) -> None:
+        if self.replicas and self.health_task is None:
+            await self.check()
+            self.health_task = asyncio.create_task(self.run_health_checks())
+
+    async def stop(self) -> None:
+        if self.health_task is not None:
+            self.health_task.cancel()
+            self.health_task = None
+        for replica in self.replicas:
+            await replica.dispose()
+
+    def statistics(self) -> dict:
+        return {
+            "sticky_seconds": self.recent_writers.ttl,
+            "recent_writers": len(self.recent_writers),
+            "primary_reads": self.primary_reads,
+            "replica_reads": self.replica_reads,
+            "replicas": {replica.name: replica.statistics() for replica in self.replicas}
+        }
+
+
+replica_router = ReplicaRouter(ReplicaSettings())
+
+
+@event.listens_for(OrmSession, "after_commit")
+def mark_committed_writer(session: OrmSession) -> None:
+    username = session.info.get("writer")
+    if username is not None:
+        replica_router.mark_write(username)
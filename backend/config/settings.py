@@ -0,0 +1,218 @@
+import os
+
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+from dotenv import dotenv_values
+
+from config.engine import EngineSettings, read_setting, read_flag
+
+from utils.jwt_handler import JwtSettings
+
+
+@dataclass(frozen=True)
+class CacheSettings:
+    backend: str = "memory"
+    size: int = 10000
+    ttl: float = 300
+    redis_url: str = "redis://localhost:6379/0"
+    redis_pool_size: int = 10
+    redis_timeout: float = 1
+
+    @classmethod
+    def from_secrets(cls, secrets: Dict[str, str | None]) -> "CacheSettings":
+        default = cls()
+        return cls(
+            backend=read_setting(secrets, "CACHE_BACKEND", default.backend),
+            size=int(read_setting(secrets, "CACHE_SIZE", str(default.size))),
+            ttl=float(read_setting(secrets, "CACHE_TTL", str(default.ttl))),
+            redis_url=read_setting(secrets, "CACHE_REDIS_URL", default.redis_url),
+            redis_pool_size=int(read_setting(secrets, "CACHE_REDIS_POOL_SIZE", str(default.redis_pool_size))),
+            redis_timeout=float(read_setting(secrets, "CACHE_REDIS_TIMEOUT", str(default.redis_timeout)))
+        )
+
+
+@dataclass(frozen=True)
+class AuthCacheSettings:
+    size: int = 10000
+    ttl: float = 60
+
+    @classmethod
+    def from_secrets(cls, secrets: Dict[str, str | None]) -> "AuthCacheSettings":
+        default = cls()
+        return cls(
+            size=int(read_setting(secrets, "AUTH_CACHE_SIZE", str(default.size))),
+            ttl=float(read_setting(secrets, "AUTH_CACHE_TTL", str(default.ttl)))
+        )
+
+
+@dataclass(frozen=True)
+class HashSettings:
+    rounds: int | None
+    pool_size: int
+    queue_size: int
+    retry_after: int
+
+    @classmethod
+    def from_secrets(cls, secrets: Dict[str, str | None]) -> "HashSettings":
+        rounds = read_setting(secrets, "HASH_ROUNDS", "")
+        pool_size = int(read_setting(secrets, "HASH_POOL_SIZE", str(max(1, (os.cpu_count() or 2) // 2))))
+        return cls(
+            rounds=int(rounds) if rounds else None,
+            pool_size=pool_size,
+            queue_size=int(read_setting(secrets, "HASH_QUEUE_SIZE", str(pool_size * 8))),
+            retry_after=int(read_setting(secrets, "HASH_RETRY_AFTER", "1"))
+        )
+
+
+@dataclass(frozen=True)
+class ReplicaSettings:
+    urls: Tuple[str, ...] = ()
+    sticky_seconds: float = 5
+    health_interval: float = 5
+    health_timeout: float = 2
+    max_lag: float = 10
+
+    @classmethod
+    def from_secrets(cls, secrets: Dict[str, str | None]) -> "ReplicaSettings":
+        default = cls()
+        return cls(
+            urls=tuple(url.strip() for url in read_setting(secrets, "REPLICA_URLS", "").split(",") if url.strip()),
+            sticky_seconds=float(read_setting(secrets, "REPLICA_STICKY_SECONDS", str(default.sticky_seconds))),
+            health_interval=float(read_setting(secrets, "REPLICA_HEALTH_INTERVAL", str(default.health_interval))),
+            health_timeout=float(read_setting(secrets, "REPLICA_HEALTH_TIMEOUT", str(default.health_timeout))),
+            max_lag=float(read_setting(secrets, "REPLICA_MAX_LAG", str(default.max_lag)))
+        )
+
+
+@dataclass(frozen=True)
+class EventSettings:
+    backend: str = "memory"
+    queue_size: int = 100
+    keepalive: float = 15
+
+    @classmethod
+    def from_secrets(cls, secrets: Dict[str, str | None]) -> "EventSettings":
+        default = cls()
+        return cls(
+            backend=read_setting(secrets, "EVENTS_BACKEND", default.backend),
+            queue_size=int(read_setting(secrets, "EVENTS_QUEUE_SIZE", str(default.queue_size))),
+            keepalive=float(read_setting(secrets, "EVENTS_KEEPALIVE", str(default.keepalive)))
+        )
+
+
+@dataclass(frozen=True)
+class PurgeSettings:
+    chunk_size: int = 1000
+    chunk_pause: float = 0.05
+    poll_interval: float = 5
+    lease_seconds: float = 60
+    max_attempts: int = 5
+
+    @classmethod
+    def from_secrets(cls, secrets: Dict[str, str | None]) -> "PurgeSettings":
+        default = cls()
+        return cls(
+            chunk_size=int(read_setting(secrets, "PURGE_CHUNK_SIZE", str(default.chunk_size))),
+            chunk_pause=float(read_setting(secrets, "PURGE_CHUNK_PAUSE", str(default.chunk_pause))),
+            poll_interval=float(read_setting(secrets, "PURGE_POLL_INTERVAL", str(default.poll_interval))),
+            lease_seconds=float(read_setting(secrets, "PURGE_LEASE_SECONDS", str(default.lease_seconds))),
+            max_attempts=int(read_setting(secrets, "PURGE_MAX_ATTEMPTS", str(default.max_attempts)))
+        )
+
+
+@dataclass(frozen=True)
+class WorkerSettings:
+    workers: int
+    db_connections: int
+    max_requests: int
+    max_requests_jitter: int
+    graceful_timeout: float
+    timeout: float
+
+    @classmethod
+    def from_secrets(cls, secrets: Dict[str, str | None]) -> "WorkerSettings":
+        return cls(
+            workers=int(read_setting(secrets, "WORKERS", str(os.cpu_count() or 1))),
+            db_connections=int(read_setting(secrets, "WORKER_DB_CONNECTIONS", "0")),
+            max_requests=int(read_setting(secrets, "WORKER_MAX_REQUESTS", "0")),
+            max_requests_jitter=int(read_setting(secrets, "WORKER_MAX_REQUESTS_JITTER", "0")),
+            graceful_timeout=float(read_setting(secrets, "WORKER_GRACEFUL_TIMEOUT", "30")),
+            timeout=float(read_setting(secrets, "WORKER_TIMEOUT", "30"))
+        )
+
+
+@dataclass(frozen=True)
+class Settings:
+    profile: str
+    sqlite_path: str
+    username: str | None
+    password: str | None
+    host: str | None
+    port: str | None
+    database: str | None
+    engine: EngineSettings
+    run_migrations: bool
+    warm_up_hasher: bool
+    warm_up_routes: bool
+    list_summary_mode: str
+    cache: CacheSettings
+    auth_cache: AuthCacheSettings
+    hash: HashSettings
+    replicas: ReplicaSettings
+    events: EventSettings
+    purge: PurgeSettings
+    workers: WorkerSettings
+    jwt: JwtSettings | None = None
+
+    @classmethod
+    def from_secrets(cls, secrets: Dict[str, str | None],
+                     utils_secrets: Dict[str, str | None] | None = None) -> "Settings":
+        jwt = JwtSettings.from_secrets(utils_secrets) if utils_secrets is not None else None
+        utils_secrets = {} if utils_secrets is None else utils_secrets
+        return cls(
+            profile=read_setting(secrets, "PROFILE", "postgres"),
+            sqlite_path=read_setting(secrets, "SQLITE_PATH", "./todo.db"),
+            username=secrets.get("USERNAME"),
+            password=secrets.get("PASSWORD"),
+            host=secrets.get("HOST"),
+            port=secrets.get("PORT"),
+            database=secrets.get("DATABASE"),
+            engine=EngineSettings.from_secrets(secrets),
+            run_migrations=read_flag(secrets, "APP_RUN_MIGRATIONS", True),
+            warm_up_hasher=read_flag(secrets, "APP_WARM_UP_HASHER", True),
+            warm_up_routes=read_flag(secrets, "APP_WARM_UP_ROUTES", True),
+            list_summary_mode=read_setting(secrets, "LIST_SUMMARY_MODE", "aggregate"),
+            cache=CacheSettings.from_secrets(secrets),
+            auth_cache=AuthCacheSettings.from_secrets(utils_secrets),
+            hash=HashSettings.from_secrets(utils_secrets),
+            replicas=ReplicaSettings.from_secrets(secrets),
+            events=EventSettings.from_secrets(secrets),
+            purge=PurgeSettings.from_secrets(secrets),
+            workers=WorkerSettings.from_secrets(secrets),
+            jwt=jwt
+        )
+
+    @classmethod
+    def from_env(cls, path: str = "./config/.env", utils_path: str = "./utils/.env") -> "Settings":
+        return cls.from_secrets(dotenv_values(path), dotenv_values(utils_path))
+
+    @property
+    def driver(self) -> str:
+        return "pysqlite" if self.profile == "sqlite" else "psycopg2"
+
+    @property
+    def async_driver(self) -> str:
+        return "aiosqlite" if self.profile == "sqlite" else "asyncpg"
+
+    @property
+    def database_url(self) -> str:
+        if self.profile == "sqlite":
+            return f"sqlite:///{self.sqlite_path}"
+        return f"postgresql://{self.username}:{self.password}@{self.host}:{self.port}/{self.database}"
+
+    @property
+    def async_database_url(self) -> str:
+        if self.profile == "sqlite":
+            return f"sqlite+aiosqlite:///{self.sqlite_path}"
+        return f"postgresql+asyncpg://{self.username}:{self.password}@{self.host}:{self.port}/{self.database}"
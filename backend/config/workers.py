@@ -0,0 +1,82 @@
+import os
+import time
+
+from multiprocessing.sharedctypes import RawArray, RawValue
+from typing import List
+
+
+SLOT_FIELDS = ("pid", "started", "heartbeat", "requests", "max_requests", "restarts")
+
+
+class WorkerSlots:
+
+    def __init__(self, count: int) -> None:
+        self.count: int = count
+        self.values = RawArray("d", count * len(SLOT_FIELDS))
+        self.generation = RawValue("q", 0)
+
+    def get(self, index: int, field: str) -> float:
+        return self.values[index * len(SLOT_FIELDS) + SLOT_FIELDS.index(field)]
+
+    def set(self, index: int, field: str, value: float) -> None:
+        self.values[index * len(SLOT_FIELDS) + SLOT_FIELDS.index(field)] = value
+
+    def claim(self, index: int, pid: int, max_requests: int) -> None:
+        now = time.time()
+        self.set(index, "pid", pid)
+        self.set(index, "started", now)
+        self.set(index, "heartbeat", now)
+        self.set(index, "requests", 0)
+        self.set(index, "max_requests", max_requests)
+
+    def beat(self, index: int, requests: int) -> None:
+        self.set(index, "heartbeat", time.time())
+        self.set(index, "requests", requests)
+
+    def release(self, index: int, restart: bool) -> None:
+        self.set(index, "pid", 0)
+        if restart:
+            self.set(index, "restarts", self.get(index, "restarts") + 1)
+
+    def bump_generation(self) -> None:
+        self.generation.value = time.time_ns()
+
+    def stale(self, timeout: float) -> List[int]:
+        now = time.time()
+        return [index for index in range(self.count)
+                if self.get(index, "pid") and now - self.get(index, "heartbeat") > timeout]
+
+    def statistics(self) -> dict:
+        now = time.time()
+        workers = []
+        for index in range(self.count):
+            pid = int(self.get(index, "pid"))
+            workers.append({
+                "index": index,
+                "pid": pid or None,
+                "uptime_seconds": round(now - self.get(index, "started"), 3) if pid else None,
+                "heartbeat_age_seconds": round(now - self.get(index, "heartbeat"), 3) if pid else None,
+                "requests": int(self.get(index, "requests")),
+                "max_requests": int(self.get(index, "max_requests")) or None,
+                "restarts": int(self.get(index, "restarts"))
+            })
+        return {"pid": os.getpid(), "worker_index": worker_index, "workers": workers}
+
+
+worker_slots: WorkerSlots | None = None
+worker_index: int | None = None
+
+
+def worker_statistics() -> dict:
+    if worker_slots is None:
+        return {"pid": os.getpid(), "worker_index": None, "workers": []}
+    return worker_slots.statistics()
+
+
+def bump_generation() -> None:
+    if worker_slots is not None:
+        worker_slots.bump_generation()
+
+
+def current_generation() -> int:
+    return worker_slots.generation.value if worker_slots is not None else 0
@@ -1,23 +1,131 @@
-import uvicorn
+import time
+import asyncio
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
+from fastapi import FastAPI, Request, status
+from fastapi.responses import ORJSONResponse
+
+from sqlalchemy.orm import configure_mappers
+
+from starlette.concurrency import run_in_threadpool
+
+from config.database import database, migrate_data_base, warm_up_database
+from config.replicas import replica_router
+from config.settings import Settings
+
+from middlewares.auth_handler import configure_principal_cache, principal_cache
 from middlewares.error_handler import ErrorHandler
+from middlewares.metrics_handler import MetricsHandler
+from middlewares.replica_handler import ReplicaStickyHandler
+
+from utils.hash_handler import HashQueueFullError, configure_hasher, shutdown_executor, warm_up_executor
+from utils.jwt_handler import configure_jwt
 
 from routers.user import user_router
 from routers.list import list_router
 from routers.todo import todo_router
+from routers.health import health_router
+from routers.events import events_router
+
+from services.cache import configure_cache, payload_cache
+from services.events import broker, configure_events, start_event_fanout, stop_event_fanout
+from services.purge import purge_worker
+
+
+async def warm_up(app: FastAPI, settings: Settings) -> None:
+    warm_ups = [warm_up_database()]
+    if settings.warm_up_hasher:
+        warm_ups.append(warm_up_executor())
+    await asyncio.gather(*warm_ups)
+
+    if settings.warm_up_routes:
+        configure_mappers()
+        app.openapi()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    settings: Settings = app.state.settings
+    start = time.perf_counter()
 
+    if settings.run_migrations:
+        await run_in_threadpool(migrate_data_base)
+    await warm_up(app, settings)
+    await start_event_fanout(settings.events)
+    await replica_router.start()
+    await purge_worker.start()
 
-app = FastAPI()
+    app.state.startup_seconds = time.perf_counter() - start
+    app.state.ready = True
+    try:
+        yield
+    finally:
+        app.state.ready = False
+        await purge_worker.stop()
+        await stop_event_fanout()
+        await replica_router.stop()
+        await payload_cache.backend.close()
+        await database.dispose()
+        shutdown_executor()
 
-app.title = "To-Do App"
-app.version = "0.0.1"
-app.add_middleware(ErrorHandler)
-app.include_router(user_router)
-app.include_router(list_router)
-app.include_router(todo_router)
+
+async def hash_queue_full_handler(request: Request, exc: HashQueueFullError) -> ORJSONResponse:
+    return ORJSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"error": str(exc)},
+                          headers={"Retry-After": str(exc.retry_after)})
+
+
+def create_app(settings: Settings | None = None) -> FastAPI:
+    settings = settings or Settings.from_env()
+    database.configure(settings)
+    if settings.jwt is not None:
+        configure_jwt(settings.jwt)
+    configure_hasher(settings.hash)
+    configure_cache(settings.cache)
+    configure_principal_cache(settings.auth_cache)
+    configure_events(settings.events)
+    replica_router.configure(settings.replicas)
+    purge_worker.configure(settings.purge)
+
+    app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
+
+    app.title = "To-Do App"
+    app.version = "0.0.1"
+    app.state.settings = settings
+    app.state.database = database
+    app.state.payload_cache = payload_cache
+    app.state.principal_cache = principal_cache
+    app.state.broker = broker
+    app.state.replica_router = replica_router
+    app.state.purge_worker = purge_worker
+    app.state.ready = False
+    app.add_middleware(ReplicaStickyHandler)
+    app.add_middleware(ErrorHandler)
+    app.add_middleware(MetricsHandler)
+    app.include_router(user_router)
+    app.include_router(list_router)
+    app.include_router(todo_router)
+    app.include_router(health_router)
+    app.include_router(events_router)
+    app.add_exception_handler(HashQueueFullError, hash_queue_full_handler)
+
+    return app
+
+
+_app: FastAPI | None = None
+
+
+def __getattr__(name: str):
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=True)
+    import uvicorn
+
+    uvicorn.run("main:create_app", factory=True, host="127.0.0.1", port=8000, reload=True)
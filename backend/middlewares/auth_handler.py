@@ -1,39 +1,86 @@
-from fastapi import Request, HTTPException, status, Depends
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, OAuth2PasswordBearer
+import time
 
-from jwt import DecodeError
+from fastapi import HTTPException, Request, status, Depends
+from fastapi.security import OAuth2PasswordBearer
 
-from utils.jwt_handler import verify_jwt, decode_jwt
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession, object_session
 
-from typing import Annotated
+from utils.jwt_handler import decode_jwt
+from utils.ttl_cache import TTLCache
 
-from config.database import Session, get_db
+from typing import Annotated, List, Tuple
 
-from schemas.user import UserLogin
+from config.database import AsyncSession, get_async_db
+from config.replicas import STICKY_COOKIE, replica_router
+from config.settings import AuthCacheSettings
+from config.workers import bump_generation, current_generation
 
-from services.user import UserService
+from models.user import User as UserModel
+
+from schemas.user import Principal
+
+from services.user import AsyncUserService
+from services.cache import stage_principal_invalidation
+from services.events import postgres_fanout
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="users/login")
 
+PRINCIPALS_CHANNEL = "principals"
+
+principal_cache = TTLCache(maxsize=AuthCacheSettings().size, ttl=AuthCacheSettings().ttl)
+principal_generation: int = 0
+principal_invalidations: int = 0
+
+
+def configure_principal_cache(settings: AuthCacheSettings) -> None:
+    principal_cache.configure(settings.size, settings.ttl)
+
+
+def invalidate_principal(username: str) -> int:
+    return principal_cache.delete_where(lambda principal: principal.username == username)
+
+
+def invalidate_principals(usernames: List[str]) -> None:
+    global principal_invalidations
+    principal_invalidations += 1
+    for username in usernames:
+        invalidate_principal(username)
+
+
+def sync_principal_cache() -> Tuple[int, int]:
+    global principal_generation
+    generation = current_generation()
+    if generation != principal_generation:
+        principal_cache.clear()
+        principal_generation = generation
+    return generation, principal_invalidations
 
-class JWTBearer(HTTPBearer):
 
-    def __init__(self, auto_error: bool = True):
-        super(JWTBearer, self).__init__(auto_error=auto_error)
+@event.listens_for(UserModel, "after_update")
+def invalidate_updated_principal(mapper, connection, target: UserModel) -> None:
+    stage_principal_invalidation(object_session(target), [target.username])
 
-    async def __call__(self, request: Request):
 
-        credentials: HTTPAuthorizationCredentials = await super(JWTBearer, self).__call__(request)
+@event.listens_for(UserModel, "after_delete")
+def invalidate_deleted_principal(mapper, connection, target: UserModel) -> None:
+    stage_principal_invalidation(object_session(target), [target.username])
 
-        if credentials:
-            if not credentials.scheme == "Bearer":
-                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid authentication scheme.")
-            if not verify_jwt(credentials.credentials):
-                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid or Expired token!")
-            return credentials.credentials
-        else:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid authorization code.")
+
+@event.listens_for(OrmSession, "after_commit")
+def broadcast_committed_principals(session: OrmSession) -> None:
+    usernames: List[str] = session.info.pop("principal_invalidations", [])
+    if not usernames:
+        return
+
+    invalidate_principals(usernames)
+    bump_generation()
+    if postgres_fanout.connection is not None:
+        postgres_fanout.notify([(PRINCIPALS_CHANNEL, {"type": "principals.invalidated", "usernames": usernames})])
+
+
+postgres_fanout.add_handler(PRINCIPALS_CHANNEL, lambda event: invalidate_principals(event["usernames"]))
 
 
 class OAuth2Bearer:
@@ -41,8 +88,13 @@ class OAuth2Bearer:
     def __init__(self):
         pass
 
-    def __call__(self, token: Annotated[str, Depends(oauth2_scheme)],
-                 db: Annotated[Session, Depends(get_db)]) -> UserLogin:
+    async def __call__(self, token: Annotated[str, Depends(oauth2_scheme)],
+                       db: Annotated[AsyncSession, Depends(get_async_db)]) -> Principal:
+        version = sync_principal_cache()
+        principal: Principal | None = principal_cache.get(token)
+        if principal is not None:
+            return principal
+
         credentials_exception = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
@@ -51,23 +103,37 @@ class OAuth2Bearer:
             },
         )
 
-        try:
-            payload: dict = decode_jwt(token)
-            username: str = payload.get("username")
-            if username is None:
-                raise credentials_exception
-
-        except DecodeError:
+        payload: dict = decode_jwt(token)
+        username: str | None = payload.get("username")
+        if username is None:
             raise credentials_exception
 
-        service = UserService(db)
-        user = service.get_user_by_username(username)
+        service = AsyncUserService(db)
+        user = await service.get_user_by_username(username)
 
-        if not service.exists_user(user):
+        if not service.exists_user(user) or not user.active:
             raise credentials_exception
 
-        return user
+        principal = Principal.model_validate(user)
+        # An invalidation that lands while the user was loading may predate what was read, so skip caching it.
+        if (current_generation(), principal_invalidations) == version:
+            principal_cache.set(token, principal, ttl=payload["expires"] - time.time())
+        await db.close()
+
+        return principal
 
 
-jwt_bearer = JWTBearer()
 oauth2_bearer = OAuth2Bearer()
+
+
+async def get_async_read_db(request: Request,
+                            current_user: Annotated[Principal, Depends(oauth2_bearer)]) -> AsyncSession:
+    marker = request.cookies.get(STICKY_COOKIE)
+    async with replica_router.read_sessionmaker(current_user.username, marker)() as db:
+        yield db
+
+
+async def get_async_write_db(db: Annotated[AsyncSession, Depends(get_async_db)],
+                             current_user: Annotated[Principal, Depends(oauth2_bearer)]) -> AsyncSession:
+    db.info["writer"] = current_user.username
+    yield db
@@ -1,14 +1,84 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi import FastAPI, Request, Response
-from fastapi.responses import JSONResponse
+import re
+import time
+import uuid
+import asyncio
+import logging
 
+from typing import Tuple
 
-class ErrorHandler(BaseHTTPMiddleware):
-    def __init__(self, app: FastAPI) -> None:
-        super().__init__(app)
+from fastapi import status
+from fastapi.responses import ORJSONResponse
+
+from sqlalchemy.exc import IntegrityError, OperationalError, TimeoutError as PoolTimeoutError
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+
+def map_exception(exc: Exception) -> Tuple[int, str, dict]:
+    if isinstance(exc, IntegrityError):
+        return status.HTTP_409_CONFLICT, "The request conflicts with existing data", {}
+    if isinstance(exc, PoolTimeoutError):
+        return status.HTTP_503_SERVICE_UNAVAILABLE, "No database connection available", {"Retry-After": "1"}
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError)):
+        return status.HTTP_504_GATEWAY_TIMEOUT, "The request timed out", {}
+    if isinstance(exc, OperationalError):
+        return status.HTTP_503_SERVICE_UNAVAILABLE, "The database is unavailable", {"Retry-After": "1"}
+    return status.HTTP_500_INTERNAL_SERVER_ERROR, "Internal server error", {}
+
+
+class ErrorHandler:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = self.get_request_id(scope)
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        start = time.perf_counter()
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                headers = MutableHeaders(scope=message)
+                headers.append(REQUEST_ID_HEADER, request_id)
+                headers.append("Server-Timing", f"app;dur={(time.perf_counter() - start) * 1000:.3f}")
+            await send(message)
 
-    async def dispatch(self, request: Request, call_next) -> Response | JSONResponse:
         try:
-            return await call_next(request)
-        except Exception as e:
-            return JSONResponse(status_code=500, content={'error': str(e)})
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            if response_started:
+                raise
+
+            status_code, message, headers = map_exception(exc)
+            if status_code == status.HTTP_500_INTERNAL_SERVER_ERROR:
+                logger.exception("Unhandled error on request %s", request_id)
+            else:
+                logger.warning("Request %s failed with %s: %r", request_id, status_code, exc)
+
+            response = ORJSONResponse(status_code=status_code, content={"error": message, "request_id": request_id},
+                                      headers=headers)
+            await response(scope, receive, send_wrapper)
+
+    @staticmethod
+    def get_request_id(scope: Scope) -> str:
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+                if REQUEST_ID_PATTERN.match(request_id):
+                    return request_id
+                break
+        return uuid.uuid4().hex
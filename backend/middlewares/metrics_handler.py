@@ -0,0 +1,68 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from utils.metrics import (RequestStatistics, request_statistics, http_requests, http_request_duration,
+                           http_requests_in_flight, http_response_size, db_statements_per_request,
+                           db_duration_per_request)
+
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def get_route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+
+    endpoint = scope.get("endpoint")
+    if endpoint is not None:
+        for route in scope["app"].router.routes:
+            if getattr(route, "endpoint", None) is endpoint:
+                return route.path
+    return UNMATCHED_ROUTE
+
+
+class MetricsHandler:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        statistics = RequestStatistics()
+        token = request_statistics.set(statistics)
+
+        start = time.perf_counter()
+        status_code = 500
+        response_size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", f"db;dur={statistics.db_seconds * 1000:.3f};"
+                                                f"desc=\"{statistics.db_statements} statements\"")
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        http_requests_in_flight.inc((method,))
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec((method,))
+            request_statistics.reset(token)
+
+            labels = (method, get_route_template(scope))
+
+            http_requests.inc(labels + (str(status_code),))
+            http_request_duration.observe(labels, time.perf_counter() - start)
+            http_response_size.observe(labels, response_size)
+            db_statements_per_request.observe(labels, statistics.db_statements)
+            db_duration_per_request.observe(labels, statistics.db_seconds)
@@ -0,0 +1,33 @@
+import math
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.replicas import STICKY_COOKIE, replica_router, request_writer
+
+
+class ReplicaStickyHandler:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not replica_router.replicas:
+            await self.app(scope, receive, send)
+            return
+
+        writer = {}
+        token = request_writer.set(writer)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and "username" in writer:
+                marker = replica_router.write_marker(writer["username"])
+                max_age = math.ceil(replica_router.recent_writers.ttl)
+                MutableHeaders(scope=message).append(
+                    "Set-Cookie", f"{STICKY_COOKIE}={marker}; Max-Age={max_age}; Path=/; HttpOnly; SameSite=Lax"
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_writer.reset(token)
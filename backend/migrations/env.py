@@ -0,0 +1,41 @@
+from alembic import context
+
+from config.database import Base, engine, database_url
+
+import models.user
+import models.list
+import models.todo
+import models.import_checkpoint
+import models.purge_job
+
+from models.search import SEARCH_OBJECTS
+
+
+target_metadata = Base.metadata
+
+
+def include_object(object_, name, type_, reflected, compare_to) -> bool:
+    return not (reflected and compare_to is None and name in SEARCH_OBJECTS)
+
+
+def run_migrations_offline() -> None:
+    context.configure(url=database_url, target_metadata=target_metadata, literal_binds=True,
+                      dialect_opts={"paramstyle": "named"}, include_object=include_object)
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata, render_as_batch=True,
+                          include_object=include_object)
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,60 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2023-08-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Databases created by create_all before migrations existed already have these tables.
+    existing = sa.inspect(op.get_bind()).get_table_names()
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("username", sa.String(100), primary_key=True, nullable=False),
+            sa.Column("email", sa.String(100), unique=True, nullable=False),
+            sa.Column("name", sa.String(100), nullable=False),
+            sa.Column("password_hash", sa.String(255), nullable=False),
+            sa.Column("active", sa.Boolean, nullable=False),
+            sa.Column("registration_time", sa.TIMESTAMP, server_default=sa.func.now(), nullable=False)
+        )
+
+    if "lists" not in existing:
+        op.create_table(
+            "lists",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("user_id", sa.String(100), sa.ForeignKey("users.username"), nullable=False),
+            sa.Column("name", sa.String(300), unique=True, nullable=False),
+            sa.Column("registration_time", sa.TIMESTAMP, server_default=sa.func.now(), nullable=False)
+        )
+
+    if "todos" not in existing:
+        op.create_table(
+            "todos",
+            sa.Column("id", sa.Integer, primary_key=True, nullable=False),
+            sa.Column("list_id", sa.Integer, sa.ForeignKey("lists.id"), nullable=False),
+            sa.Column("title", sa.String(60), unique=True, nullable=False),
+            sa.Column("description", sa.String(400), nullable=False),
+            sa.Column("completed", sa.Boolean, nullable=False),
+            sa.Column("registration_time", sa.TIMESTAMP, server_default=sa.func.now(), nullable=False)
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("todos")
+    op.drop_table("lists")
+    op.drop_table("users")
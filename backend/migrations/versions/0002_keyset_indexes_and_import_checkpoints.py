@@ -0,0 +1,44 @@
+"""keyset indexes and import checkpoints
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if "ix_lists_user_id_registration_time_id" not in {index["name"] for index in inspector.get_indexes("lists")}:
+        op.create_index("ix_lists_user_id_registration_time_id", "lists", ["user_id", "registration_time", "id"])
+
+    if "ix_todos_list_id_registration_time_id" not in {index["name"] for index in inspector.get_indexes("todos")}:
+        op.create_index("ix_todos_list_id_registration_time_id", "todos", ["list_id", "registration_time", "id"])
+
+    if "import_checkpoints" not in inspector.get_table_names():
+        op.create_table(
+            "import_checkpoints",
+            sa.Column("id", sa.String(100), primary_key=True),
+            sa.Column("user_id", sa.String(100), sa.ForeignKey("users.username"), nullable=False),
+            sa.Column("line", sa.Integer, nullable=False),
+            sa.Column("list_ids", sa.Text, nullable=False),
+            sa.Column("update_time", sa.TIMESTAMP, server_default=sa.func.now(), nullable=False)
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("import_checkpoints")
+    op.drop_index("ix_todos_list_id_registration_time_id", "todos")
+    op.drop_index("ix_lists_user_id_registration_time_id", "lists")
@@ -0,0 +1,38 @@
+"""unique todo title per list
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SQLite reflects unnamed unique constraints without a name, batch mode needs one to drop them.
+naming_convention = {"uq": "uq_%(table_name)s_%(column_0_name)s"}
+
+
+def upgrade() -> None:
+    unique_constraints = sa.inspect(op.get_bind()).get_unique_constraints("todos")
+    title_constraint = next((constraint for constraint in unique_constraints
+                             if constraint["column_names"] == ["title"]), None)
+
+    with op.batch_alter_table("todos", naming_convention=naming_convention) as batch_op:
+        if title_constraint is not None:
+            batch_op.drop_constraint(title_constraint["name"] or "uq_todos_title", type_="unique")
+        batch_op.create_unique_constraint("uq_todos_list_id_title", ["list_id", "title"])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("todos", naming_convention=naming_convention) as batch_op:
+        batch_op.drop_constraint("uq_todos_list_id_title", type_="unique")
+        batch_op.create_unique_constraint("uq_todos_title", ["title"])
@@ -0,0 +1,31 @@
+"""todo full text search
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from models.search import POSTGRES_SEARCH_DDL, POSTGRES_SEARCH_DROP, SQLITE_SEARCH_DDL, SQLITE_SEARCH_DROP
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    statements = POSTGRES_SEARCH_DDL if op.get_bind().dialect.name == "postgresql" else SQLITE_SEARCH_DDL
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    statements = POSTGRES_SEARCH_DROP if op.get_bind().dialect.name == "postgresql" else SQLITE_SEARCH_DROP
+    for statement in statements:
+        op.execute(statement)
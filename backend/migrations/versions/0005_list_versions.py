@@ -0,0 +1,33 @@
+"""list versions
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if "version" not in {column["name"] for column in inspector.get_columns("lists")}:
+        op.add_column("lists", sa.Column("version", sa.Integer, nullable=False, server_default="1"))
+
+    if "lists_version" not in {column["name"] for column in inspector.get_columns("users")}:
+        op.add_column("users", sa.Column("lists_version", sa.Integer, nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    op.drop_column("users", "lists_version")
+    op.drop_column("lists", "version")
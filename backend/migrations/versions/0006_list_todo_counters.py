@@ -0,0 +1,40 @@
+"""list todo counters
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {column["name"] for column in inspector.get_columns("lists")}
+
+    if "todo_count" not in columns:
+        op.add_column("lists", sa.Column("todo_count", sa.Integer, nullable=False, server_default="0"))
+
+    if "completed_count" not in columns:
+        op.add_column("lists", sa.Column("completed_count", sa.Integer, nullable=False, server_default="0"))
+
+    op.execute(
+        "UPDATE lists SET "
+        "todo_count = (SELECT count(*) FROM todos WHERE todos.list_id = lists.id), "
+        "completed_count = (SELECT count(*) FROM todos WHERE todos.list_id = lists.id AND todos.completed)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("lists", "completed_count")
+    op.drop_column("lists", "todo_count")
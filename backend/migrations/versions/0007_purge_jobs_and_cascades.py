@@ -0,0 +1,87 @@
+"""purge jobs and cascading foreign keys
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from models.search import SQLITE_SEARCH_DDL
+from models.types import Timestamp
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SQLite foreign keys have no names, batch mode needs one to drop them
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+FOREIGN_KEYS = [
+    ("lists", "user_id", "users", "username"),
+    ("todos", "list_id", "lists", "id"),
+    ("import_checkpoints", "user_id", "users", "username"),
+]
+
+
+def replace_foreign_key(table: str, column: str, referent: str, remote_column: str, ondelete: str | None) -> None:
+    inspector = sa.inspect(op.get_bind())
+    foreign_key = next(foreign_key for foreign_key in inspector.get_foreign_keys(table)
+                       if foreign_key["constrained_columns"] == [column])
+
+    if (foreign_key["options"].get("ondelete") or "").upper() == (ondelete or "").upper():
+        return
+
+    name = foreign_key["name"] or f"fk_{table}_{column}_{referent}"
+    with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint(name, type_="foreignkey")
+        batch_op.create_foreign_key(name, referent, [column], [remote_column], ondelete=ondelete)
+
+
+def restore_search_triggers() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        for statement in SQLITE_SEARCH_DDL:
+            op.execute(statement)
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if "purge_jobs" not in inspector.get_table_names():
+        op.create_table(
+            "purge_jobs",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("user_id", sa.String(100), nullable=False),
+            sa.Column("status", sa.String(20), nullable=False),
+            sa.Column("attempts", sa.Integer, nullable=False),
+            sa.Column("lists_deleted", sa.Integer, nullable=False),
+            sa.Column("todos_deleted", sa.Integer, nullable=False),
+            sa.Column("error", sa.Text, nullable=True),
+            sa.Column("locked_until", Timestamp, nullable=True),
+            sa.Column("registration_time", Timestamp, nullable=False, server_default=sa.func.now()),
+            sa.Column("update_time", Timestamp, nullable=False, server_default=sa.func.now()),
+        )
+        op.create_index("ix_purge_jobs_user_id", "purge_jobs", ["user_id"])
+        op.create_index("ix_purge_jobs_status_locked_until", "purge_jobs", ["status", "locked_until"])
+
+    for table, column, referent, remote_column in FOREIGN_KEYS:
+        replace_foreign_key(table, column, referent, remote_column, "CASCADE")
+
+    restore_search_triggers()
+
+
+def downgrade() -> None:
+    for table, column, referent, remote_column in FOREIGN_KEYS:
+        replace_foreign_key(table, column, referent, remote_column, None)
+
+    restore_search_triggers()
+
+    op.drop_index("ix_purge_jobs_status_locked_until", "purge_jobs")
+    op.drop_index("ix_purge_jobs_user_id", "purge_jobs")
+    op.drop_table("purge_jobs")
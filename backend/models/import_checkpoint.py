@@ -0,0 +1,31 @@
+from config.database import Base
+from models.types import Timestamp
+import datetime
+
+from sqlalchemy import (
+    String,
+    Integer,
+    Text,
+    ForeignKey,
+    func
+)
+
+from sqlalchemy.orm import (
+    Mapped,
+    mapped_column
+)
+
+
+class ImportCheckpoint(Base):
+    __tablename__ = "import_checkpoints"
+
+    id: Mapped[str] = mapped_column(String(100), primary_key=True)
+
+    user_id: Mapped[str] = mapped_column(ForeignKey("users.username", ondelete="CASCADE"), nullable=False)
+
+    line: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    list_ids: Mapped[str] = mapped_column(Text, nullable=False, default="{}")
+
+    update_time: Mapped[datetime.datetime] = mapped_column(Timestamp, nullable=False, server_default=func.now(),
+                                                           onupdate=func.now())
@@ -1,11 +1,13 @@
 from config.database import Base
+from models.types import Timestamp
 from typing import List
 import datetime
 
 from sqlalchemy import (
     String,
-    TIMESTAMP,
+    Integer,
     ForeignKey,
+    Index,
     func
 )
 
@@ -18,15 +20,24 @@ from sqlalchemy.orm import (
 
 class TodoList(Base):
     __tablename__ = "lists"
+    __table_args__ = (
+        Index("ix_lists_user_id_registration_time_id", "user_id", "registration_time", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.username"))
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.username", ondelete="CASCADE"))
 
     name: Mapped[str] = mapped_column(String(300), unique=True, nullable=False)
 
-    registration_time: Mapped[datetime.datetime] = mapped_column(TIMESTAMP, nullable=False, server_default=func.now())
+    registration_time: Mapped[datetime.datetime] = mapped_column(Timestamp, nullable=False, server_default=func.now())
+
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+
+    todo_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+    completed_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     user: Mapped["User"] = relationship(argument="User", back_populates="lists")
 
-    todos: Mapped[List["Todo"]] = relationship(back_populates="todo_list")
+    todos: Mapped[List["Todo"]] = relationship(back_populates="todo_list", passive_deletes=True)
@@ -0,0 +1,44 @@
+from config.database import Base
+from models.types import Timestamp
+import datetime
+
+from sqlalchemy import (
+    String,
+    Integer,
+    Text,
+    Index,
+    func
+)
+
+from sqlalchemy.orm import (
+    Mapped,
+    mapped_column
+)
+
+
+class PurgeJob(Base):
+    __tablename__ = "purge_jobs"
+    __table_args__ = (
+        Index("ix_purge_jobs_status_locked_until", "status", "locked_until"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+    user_id: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
+
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
+
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    lists_deleted: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    todos_deleted: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    locked_until: Mapped[datetime.datetime | None] = mapped_column(Timestamp, nullable=True)
+
+    registration_time: Mapped[datetime.datetime] = mapped_column(Timestamp, nullable=False, server_default=func.now())
+
+    update_time: Mapped[datetime.datetime] = mapped_column(Timestamp, nullable=False, server_default=func.now(),
+                                                           onupdate=func.now())
@@ -0,0 +1,46 @@
+from sqlalchemy import column, literal_column, table
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+# Full-text search lives outside the ORM: a generated tsvector column on postgres
+# and an external-content FTS5 table kept in sync by triggers on sqlite.
+search_vector = literal_column("todos.search_vector", TSVECTOR)
+
+todos_fts = table("todos_fts", column("rowid"))
+todos_fts_match = literal_column("todos_fts")
+
+SEARCH_OBJECTS = {"search_vector", "ix_todos_search_vector", "todos_fts", "todos_fts_data", "todos_fts_idx",
+                  "todos_fts_content", "todos_fts_docsize", "todos_fts_config"}
+
+POSTGRES_SEARCH_DDL = [
+    "ALTER TABLE todos ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_todos_search_vector ON todos USING gin (search_vector)"
+]
+
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS todos_fts USING fts5("
+    "title, description, content='todos', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS todos_fts_insert AFTER INSERT ON todos BEGIN "
+    "INSERT INTO todos_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS todos_fts_delete AFTER DELETE ON todos BEGIN "
+    "INSERT INTO todos_fts(todos_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS todos_fts_update AFTER UPDATE OF title, description ON todos BEGIN "
+    "INSERT INTO todos_fts(todos_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO todos_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "INSERT INTO todos_fts(todos_fts) VALUES ('rebuild')"
+]
+
+SQLITE_SEARCH_DROP = [
+    "DROP TRIGGER IF EXISTS todos_fts_update",
+    "DROP TRIGGER IF EXISTS todos_fts_delete",
+    "DROP TRIGGER IF EXISTS todos_fts_insert",
+    "DROP TABLE IF EXISTS todos_fts"
+]
+
+POSTGRES_SEARCH_DROP = [
+    "DROP INDEX IF EXISTS ix_todos_search_vector",
+    "ALTER TABLE todos DROP COLUMN IF EXISTS search_vector"
+]
@@ -1,11 +1,13 @@
 from config.database import Base
+from models.types import Timestamp
 import datetime
 
 from sqlalchemy import (
     String,
-    TIMESTAMP,
     Boolean,
     ForeignKey,
+    Index,
+    UniqueConstraint,
     func
 )
 
@@ -18,17 +20,21 @@ from sqlalchemy.orm import (
 
 class Todo(Base):
     __tablename__ = "todos"
+    __table_args__ = (
+        Index("ix_todos_list_id_registration_time_id", "list_id", "registration_time", "id"),
+        UniqueConstraint("list_id", "title", name="uq_todos_list_id_title"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, nullable=False)
 
-    list_id: Mapped[int] = mapped_column(ForeignKey("lists.id"))
+    list_id: Mapped[int] = mapped_column(ForeignKey("lists.id", ondelete="CASCADE"))
 
-    title: Mapped[str] = mapped_column(String(60), unique=True, nullable=False)
+    title: Mapped[str] = mapped_column(String(60), nullable=False)
 
     description: Mapped[str] = mapped_column(String(400), nullable=False)
 
     completed: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
 
-    registration_time: Mapped[datetime.datetime] = mapped_column(TIMESTAMP, nullable=False, server_default=func.now())
+    registration_time: Mapped[datetime.datetime] = mapped_column(Timestamp, nullable=False, server_default=func.now())
 
     todo_list: Mapped["TodoList"] = relationship(argument="TodoList", back_populates="todos")
@@ -0,0 +1,6 @@
+from sqlalchemy import TIMESTAMP
+from sqlalchemy.dialects import sqlite
+
+# SQLite compares timestamps as text, so bound parameters have to use the same
+# format as CURRENT_TIMESTAMP for keyset comparisons to match.
+Timestamp = TIMESTAMP().with_variant(sqlite.DATETIME(truncate_microseconds=True), "sqlite")
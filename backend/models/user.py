@@ -1,11 +1,12 @@
 from config.database import Base
+from models.types import Timestamp
 from typing import List
 import datetime
 
 from sqlalchemy import (
     String,
+    Integer,
     Boolean,
-    TIMESTAMP,
     func
 )
 
@@ -29,6 +30,8 @@ class User(Base):
 
     active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
 
-    registration_time: Mapped[datetime.datetime] = mapped_column(TIMESTAMP, server_default=func.now(), nullable=False)
+    registration_time: Mapped[datetime.datetime] = mapped_column(Timestamp, server_default=func.now(), nullable=False)
 
-    lists: Mapped[List["TodoList"]] = relationship(back_populates="user")
+    lists_version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+
+    lists: Mapped[List["TodoList"]] = relationship(back_populates="user", passive_deletes=True)
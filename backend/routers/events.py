@@ -0,0 +1,128 @@
+import json
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+
+from typing import Annotated, AsyncIterator
+
+from config.database import get_async_db, AsyncSession
+
+from middlewares.auth_handler import oauth2_bearer
+
+from schemas.user import User
+
+from services.authorization import AsyncAuthorizationService
+from services.events import broker, list_channel, user_channel
+
+from routers.list import authorize_list_access
+
+from utils.broker import Subscription
+
+
+events_router = APIRouter()
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no"
+}
+
+
+def format_sse(event: dict) -> bytes:
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n".encode()
+
+
+async def stream_events(subscription: Subscription, keepalive: float) -> AsyncIterator[bytes]:
+    try:
+        yield f"retry: {int(keepalive * 1000)}\n\n".encode()
+
+        while True:
+            try:
+                event = await subscription.get(keepalive)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+
+            if event is None:
+                yield b"event: dropped\ndata: {}\n\n"
+                return
+
+            yield format_sse(event)
+    finally:
+        subscription.close()
+
+
+@events_router.get(path="/lists/{list_id}/events", tags=["events"], status_code=status.HTTP_200_OK)
+async def get_list_events(request: Request, list_id: Annotated[int, Path(ge=1)],
+                          current_user: Annotated[User, Depends(oauth2_bearer)],
+                          db: Annotated[AsyncSession, Depends(get_async_db)]) -> StreamingResponse:
+
+    await authorize_list_access(list_id, current_user, AsyncAuthorizationService(db))
+    await db.close()
+
+    subscription = broker.subscribe(list_channel(list_id))
+    return StreamingResponse(stream_events(subscription, request.app.state.settings.events.keepalive),
+                             media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@events_router.get(path="/users/{user_id}/events", tags=["events"], status_code=status.HTTP_200_OK)
+async def get_user_events(request: Request, user_id: Annotated[str, Path(max_length=100)],
+                          current_user: Annotated[User, Depends(oauth2_bearer)]) -> StreamingResponse:
+
+    if not AsyncAuthorizationService.is_owner(user_id, current_user.username):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="The requested user's username does not match the authenticated user's username. Access denied.",
+            headers={
+                "Username-Conflict": user_id
+            }
+        )
+
+    subscription = broker.subscribe(user_channel(user_id))
+    return StreamingResponse(stream_events(subscription, request.app.state.settings.events.keepalive),
+                             media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@events_router.websocket(path="/lists/{list_id}/ws")
+async def list_events_websocket(websocket: WebSocket, list_id: Annotated[int, Path(ge=1)],
+                                token: Annotated[str, Query()]) -> None:
+    try:
+        async with AsyncSession() as db:
+            current_user = await oauth2_bearer(token, db)
+            await authorize_list_access(list_id, current_user, AsyncAuthorizationService(db))
+    except HTTPException as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(e.detail)[:120])
+        return
+
+    await websocket.accept()
+    subscription = broker.subscribe(list_channel(list_id))
+    keepalive = websocket.app.state.settings.events.keepalive
+
+    async def forward() -> None:
+        while True:
+            try:
+                event = await subscription.get(keepalive)
+            except asyncio.TimeoutError:
+                await websocket.send_json({"type": "keepalive"})
+                continue
+
+            if event is None:
+                await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Consumer too slow")
+                return
+
+            await websocket.send_json(event)
+
+    async def receive() -> None:
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+
+    tasks = {asyncio.create_task(forward()), asyncio.create_task(receive())}
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        subscription.close()
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Request, status
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+
+from config.database import get_pool_statistics
+from config.replicas import replica_router
+from config.workers import worker_statistics
+
+from middlewares.auth_handler import principal_cache
+
+from services.cache import payload_cache
+from services.events import broker
+from services.purge import purge_worker
+
+from utils.hash_handler import hash_metrics
+from utils.metrics import registry
+
+
+health_router = APIRouter()
+
+
+@health_router.get(path="/health/ready", tags=["health"], status_code=status.HTTP_200_OK)
+async def get_readiness(request: Request) -> ORJSONResponse:
+    ready = getattr(request.app.state, "ready", False)
+    content = {"ready": ready, "startup_seconds": getattr(request.app.state, "startup_seconds", None)}
+    return ORJSONResponse(status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+                          content=content)
+
+
+@health_router.get(path="/health/pool", tags=["health"], status_code=status.HTTP_200_OK)
+async def get_pool_health() -> ORJSONResponse:
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content=get_pool_statistics())
+
+
+@health_router.get(path="/health/auth-cache", tags=["health"], status_code=status.HTTP_200_OK)
+async def get_auth_cache_health() -> ORJSONResponse:
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content=principal_cache.statistics())
+
+
+@health_router.get(path="/health/hasher", tags=["health"], status_code=status.HTTP_200_OK)
+async def get_hasher_health() -> ORJSONResponse:
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content=hash_metrics.statistics())
+
+
+@health_router.get(path="/health/replicas", tags=["health"], status_code=status.HTTP_200_OK)
+async def get_replicas_health() -> ORJSONResponse:
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content=replica_router.statistics())
+
+
+@health_router.get(path="/health/cache", tags=["health"], status_code=status.HTTP_200_OK)
+async def get_cache_health() -> ORJSONResponse:
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content=payload_cache.statistics())
+
+
+@health_router.get(path="/health/events", tags=["health"], status_code=status.HTTP_200_OK)
+async def get_events_health() -> ORJSONResponse:
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content=broker.statistics())
+
+
+@health_router.get(path="/health/purge", tags=["health"], status_code=status.HTTP_200_OK)
+async def get_purge_health() -> ORJSONResponse:
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content=purge_worker.statistics())
+
+
+@health_router.get(path="/health/workers", tags=["health"], status_code=status.HTTP_200_OK)
+async def get_workers_health() -> ORJSONResponse:
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content=worker_statistics())
+
+
+@health_router.get(path="/metrics", tags=["health"], status_code=status.HTTP_200_OK, include_in_schema=False)
+async def get_metrics() -> PlainTextResponse:
+    return PlainTextResponse(content=registry.render(), media_type="text/plain; version=0.0.4")
@@ -1,28 +1,35 @@
-from fastapi import Depends, APIRouter, Path, HTTPException, status
-from fastapi.responses import JSONResponse
-from fastapi.encoders import jsonable_encoder
+from fastapi import Response, Depends, APIRouter, Header, Path, Query, HTTPException, status
+from fastapi.responses import ORJSONResponse
 
-from typing import List, Annotated
+from typing import List, Tuple, Annotated
 
-from config.database import get_db, Session
+from config.database import AsyncSession
 
-from middlewares.auth_handler import jwt_bearer, oauth2_bearer
+from middlewares.auth_handler import oauth2_bearer, get_async_read_db, get_async_write_db
+
+from utils.etag import make_etag, etag_matches
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from utils.responses import todo_list_serializer, todos_serializer
 
 from schemas.user import User
-from schemas.todo import Todo
+from schemas.todo import TodoResponse
 from schemas.list import TodoList, TodoListResponse
 
-from services.list import ListService
-from services.user import UserService
+from models.list import TodoList as TodoListModel
+
+from services.list import AsyncListService
+from services.authorization import AsyncAuthorizationService
+from services.cache import payload_cache, list_namespace
 
 
 list_router = APIRouter()
 
 
-def authorize_list_access(list_id: int, current_user: User, list_service: ListService, user_service: UserService):
-    todo_list = list_service.get_list_by_id(list_id)
+async def authorize_list_access(list_id: int, current_user: User,
+                                authorization_service: AsyncAuthorizationService) -> TodoListModel:
+    todo_list, owner = await authorization_service.get_list_with_owner(list_id)
 
-    if not list_service.exists_list(todo_list):
+    if todo_list is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Not found list with id {list_id}!",
@@ -31,38 +38,25 @@ def authorize_list_access(list_id: int, current_user: User, list_service: ListSe
             }
         )
 
-    user = list_service.get_user_for_list(todo_list)
-
-    if not user_service.has_same_username(current_user.username, user.username):
+    if not authorization_service.is_owner(owner, current_user.username):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"The requested user's username does not match the authenticated user's username. Access denied.",
             headers={
-                "Username-Conflict": user.username
+                "Username-Conflict": owner
             }
         )
 
     return todo_list
 
 
-@list_router.post(path="/lists", tags=["list"], response_model=TodoList, status_code=status.HTTP_201_CREATED,
-                  dependencies=[Depends(jwt_bearer)])
-def create_list(todo_list: Annotated[TodoList, Depends()],
-                current_user: Annotated[User, Depends(oauth2_bearer)],
-                db: Annotated[Session, Depends(get_db)]) -> JSONResponse:
-    user_service = UserService(db)
-    user = user_service.get_user_by_username(todo_list.user_id)
-
-    if not user_service.exists_user(user):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Not found user with username {todo_list.user_id}!",
-            headers={
-                "Username-Conflict": todo_list.user_id
-            }
-        )
+@list_router.post(path="/lists", tags=["list"], response_model=TodoList, status_code=status.HTTP_201_CREATED)
+async def create_list(todo_list: Annotated[TodoList, Depends()],
+                      current_user: Annotated[User, Depends(oauth2_bearer)],
+                      db: Annotated[AsyncSession, Depends(get_async_write_db)]) -> ORJSONResponse:
+    authorization_service = AsyncAuthorizationService(db)
 
-    if not user_service.has_same_username(current_user.username, user.username):
+    if not authorization_service.is_owner(todo_list.user_id, current_user.username):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"The requested user's username does not match the authenticated user's username. Access denied.",
@@ -71,10 +65,9 @@ def create_list(todo_list: Annotated[TodoList, Depends()],
             }
         )
 
-    list_service = ListService(db)
-    result = list_service.get_list_by_name(todo_list.name)
+    list_service = AsyncListService(db)
 
-    if list_service.exists_list(result):
+    if await list_service.create_list(todo_list) is None:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"A list with name {todo_list.name} already exists!",
@@ -83,45 +76,72 @@ def create_list(todo_list: Annotated[TodoList, Depends()],
             }
         )
 
-    list_service.create_list(todo_list)
-    return JSONResponse(status_code=status.HTTP_201_CREATED, content=todo_list.model_dump())
-
-
-@list_router.get(path="/lists/{list_id}", tags=["list"], response_model=TodoListResponse, status_code=status.HTTP_200_OK,
-                 dependencies=[Depends(jwt_bearer)])
-def get_list_by_id(list_id: Annotated[int, Path(ge=1)],
-                   current_user: Annotated[User, Depends(oauth2_bearer)],
-                   db: Annotated[Session, Depends(get_db)]) -> JSONResponse:
-
-    list_service = ListService(db)
-    user_service = UserService(db)
-
-    todo_list = authorize_list_access(list_id, current_user, list_service, user_service)
-
-    return JSONResponse(status_code=status.HTTP_200_OK,
-                        content=TodoListResponse.model_validate(jsonable_encoder(todo_list)).model_dump())
-
-
-@list_router.get(path="/lists/{list_id}/todos", tags=["list"], response_model=List[Todo],
-                 status_code=status.HTTP_200_OK, dependencies=[Depends(jwt_bearer)])
-def get_todos_for_list(list_id: Annotated[int, Path(ge=1)],
-                       current_user: Annotated[User, Depends(oauth2_bearer)],
-                       db: Annotated[Session, Depends(get_db)]):
-
-    list_service = ListService(db)
-    user_service = UserService(db)
-
-    todo_list = authorize_list_access(list_id, current_user, list_service, user_service)
-
-    if not list_service.has_any_todo(todo_list):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Any todo found in list {todo_list.name}",
-            headers={
-                "Id-Conflict": str(todo_list.id)
-            }
-        )
-
-    result = list_service.get_todos(list_id)
-
-    return JSONResponse(status_code=status.HTTP_200_OK, content=jsonable_encoder(result))
+    return ORJSONResponse(status_code=status.HTTP_201_CREATED, content=todo_list.model_dump())
+
+
+@list_router.get(path="/lists/{list_id}", tags=["list"], response_model=TodoListResponse,
+                 status_code=status.HTTP_200_OK)
+async def get_list_by_id(list_id: Annotated[int, Path(ge=1)],
+                         current_user: Annotated[User, Depends(oauth2_bearer)],
+                         db: Annotated[AsyncSession, Depends(get_async_read_db)],
+                         if_none_match: Annotated[str | None, Header()] = None) -> Response:
+
+    authorization_service = AsyncAuthorizationService(db)
+    todo_list = await authorize_list_access(list_id, current_user, authorization_service)
+
+    etag = make_etag("list", todo_list.id, todo_list.version)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    return todo_list_serializer.response(todo_list, headers={"ETag": etag})
+
+
+@list_router.get(path="/lists/{list_id}/todos", tags=["list"], response_model=List[TodoResponse],
+                 status_code=status.HTTP_200_OK)
+async def get_todos_for_list(list_id: Annotated[int, Path(ge=1)],
+                             current_user: Annotated[User, Depends(oauth2_bearer)],
+                             db: Annotated[AsyncSession, Depends(get_async_read_db)],
+                             limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+                             after: Annotated[str | None, Query(max_length=200)] = None,
+                             completed: Annotated[bool | None, Query()] = None,
+                             if_none_match: Annotated[str | None, Header()] = None) -> Response:
+
+    authorization_service = AsyncAuthorizationService(db)
+    todo_list = await authorize_list_access(list_id, current_user, authorization_service)
+
+    etag = make_etag("list-todos", todo_list.id, todo_list.version, limit, after, completed)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    list_service = AsyncListService(db)
+
+    async def load_todos() -> Tuple[bytes, str | None]:
+        try:
+            result, next_cursor = await list_service.get_todos(list_id, limit, after, completed)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid cursor {after}!",
+                headers={
+                    "Cursor-Conflict": after
+                }
+            )
+
+        if not result and after is None and completed is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Any todo found in list {todo_list.name}",
+                headers={
+                    "Id-Conflict": str(todo_list.id)
+                }
+            )
+
+        return todos_serializer.dump(result), next_cursor
+
+    payload, next_cursor = await payload_cache.get_or_load(list_namespace(list_id), repr((limit, after, completed)),
+                                                           todo_list.version, load_todos)
+
+    headers = {"ETag": etag}
+    if next_cursor is not None:
+        headers["Next-Cursor"] = next_cursor
+    return Response(content=payload, headers=headers, media_type=ORJSONResponse.media_type)
@@ -1,57 +1,69 @@
-from fastapi import Depends, APIRouter, Path, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi import Response, Depends, APIRouter, Path, Body, Query, HTTPException, status
+from fastapi.responses import ORJSONResponse
 
-from typing import Annotated
+from typing import List, Annotated
 
-from config.database import get_db, Session
+from config.database import AsyncSession
 
-from middlewares.auth_handler import jwt_bearer, oauth2_bearer
+from middlewares.auth_handler import oauth2_bearer, get_async_read_db, get_async_write_db
 
-from schemas.todo import Todo
+from schemas.todo import (Todo, TodoResponse, TodoBatchItem, TodoBatchResult, TodoBulkResult, TodoSelection,
+                          TodoSearchResult)
 from schemas.user import User
 
-from services.todo import TodoService
-from services.list import ListService
-from services.user import UserService
+from models.todo import Todo as TodoModel
+
+from services.todo import AsyncTodoService
+from services.authorization import AsyncAuthorizationService
+from services.search import AsyncSearchService
+
+from routers.list import authorize_list_access
+
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from utils.responses import todo_serializer, todo_batch_serializer, todo_bulk_serializer, todo_search_serializer
 
 
 todo_router = APIRouter()
 
+MAX_BATCH_SIZE = 500
 
-@todo_router.post(path="/todos", tags=["todo"], response_model=Todo, status_code=status.HTTP_201_CREATED,
-                  dependencies=[Depends(jwt_bearer)])
-def create_todo(todo: Annotated[Todo, Depends()],
-                current_user: Annotated[User, Depends(oauth2_bearer)],
-                db: Annotated[Session, Depends(get_db)]) -> JSONResponse:
 
-    list_service = ListService(db)
-    todo_list = list_service.get_list_by_id(todo.list_id)
+async def authorize_todo_access(todo_id: int, current_user: User,
+                                authorization_service: AsyncAuthorizationService) -> TodoModel:
+    todo, owner = await authorization_service.get_todo_with_owner(todo_id)
 
-    if not list_service.exists_list(todo_list):
+    if todo is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"No list found with id {todo.list_id}!",
+            detail=f"No todo found with id {todo_id}!",
             headers={
-                "Id-Conflict": str(todo.list_id)
+                "Id-Conflict": str(todo_id)
             }
         )
 
-    user = todo_list.user
-    user_service = UserService(db)
-
-    if not user_service.has_same_username(current_user.username, user.username):
+    if not authorization_service.is_owner(owner, current_user.username):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"The requested user's username does not match the authenticated user's username. Access denied.",
             headers={
-                "Username-Conflict": user.username
+                "Username-Conflict": owner
             }
         )
 
-    todo_service = TodoService(db)
-    result = todo_service.get_todo_by_title_for_list(todo.title, todo.list_id)
+    return todo
+
 
-    if todo_service.exists_todo(result):
+@todo_router.post(path="/todos", tags=["todo"], response_model=Todo, status_code=status.HTTP_201_CREATED)
+async def create_todo(todo: Annotated[Todo, Depends()],
+                      current_user: Annotated[User, Depends(oauth2_bearer)],
+                      db: Annotated[AsyncSession, Depends(get_async_write_db)]) -> ORJSONResponse:
+
+    authorization_service = AsyncAuthorizationService(db)
+    todo_list = await authorize_list_access(todo.list_id, current_user, authorization_service)
+
+    todo_service = AsyncTodoService(db)
+
+    if await todo_service.create_todo(todo) is None:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"A to-do with title {todo.title} already exists on list {todo_list.name}!",
@@ -60,65 +72,141 @@ def create_todo(todo: Annotated[Todo, Depends()],
             }
         )
 
-    todo_service.create_todo(todo)
-    return JSONResponse(status_code=status.HTTP_201_CREATED, content=todo.model_dump())
+    return ORJSONResponse(status_code=status.HTTP_201_CREATED, content=todo.model_dump())
 
 
-@todo_router.get(path="/todos/{todo_id}", tags=["todo"], response_model=Todo, status_code=status.HTTP_200_OK,
-                 dependencies=[Depends(jwt_bearer)])
-def get_todo_by_id(todo_id: Annotated[int, Path(ge=1)],
-                   current_user: Annotated[User, Depends(oauth2_bearer)],
-                   db: Annotated[Session, Depends(get_db)]) -> JSONResponse:
+@todo_router.post(path="/lists/{list_id}/todos:batch", tags=["todo"], response_model=List[TodoBatchResult],
+                  status_code=status.HTTP_200_OK)
+async def create_todos(list_id: Annotated[int, Path(ge=1)],
+                       todos: Annotated[List[TodoBatchItem], Body(min_length=1, max_length=MAX_BATCH_SIZE)],
+                       current_user: Annotated[User, Depends(oauth2_bearer)],
+                       db: Annotated[AsyncSession, Depends(get_async_write_db)]) -> Response:
 
-    todo_service = TodoService(db)
-    todo = todo_service.get_todo_by_id(todo_id)
+    authorization_service = AsyncAuthorizationService(db)
+    await authorize_list_access(list_id, current_user, authorization_service)
 
-    if not todo_service.exists_todo(todo):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"No todo found with id {todo_id}!",
-            headers={
-                "Id-Conflict": str(todo_id)
-            }
-        )
+    todo_service = AsyncTodoService(db)
+    results = await todo_service.create_todos(list_id, todos)
+
+    return todo_batch_serializer.response(results)
+
+
+@todo_router.get(path="/todos/search", tags=["todo"], response_model=List[TodoSearchResult],
+                 status_code=status.HTTP_200_OK)
+async def search_todos(q: Annotated[str, Query(min_length=1, max_length=200)],
+                       current_user: Annotated[User, Depends(oauth2_bearer)],
+                       db: Annotated[AsyncSession, Depends(get_async_read_db)],
+                       limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+                       after: Annotated[str | None, Query(max_length=200)] = None) -> Response:
 
-    user_service = UserService(db)
-    user = todo.todo_list.user
+    service = AsyncSearchService(db)
 
-    if not user_service.has_same_username(current_user.username, user.username):
+    try:
+        results, next_cursor = await service.search_todos(current_user.username, q, limit, after)
+    except ValueError:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail=f"The requested user's username does not match the authenticated user's username. Access denied.",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid cursor {after}!",
             headers={
-                "Username-Conflict": user.username
+                "Cursor-Conflict": after
             }
         )
 
-    return JSONResponse(status_code=status.HTTP_200_OK, content=Todo.model_validate(todo).model_dump())
+    headers = {"Next-Cursor": next_cursor} if next_cursor is not None else None
+    return todo_search_serializer.response(results, headers=headers)
+
+
+@todo_router.get(path="/todos/{todo_id}", tags=["todo"], response_model=TodoResponse,
+                 status_code=status.HTTP_200_OK)
+async def get_todo_by_id(todo_id: Annotated[int, Path(ge=1)],
+                         current_user: Annotated[User, Depends(oauth2_bearer)],
+                         db: Annotated[AsyncSession, Depends(get_async_read_db)]) -> Response:
+
+    authorization_service = AsyncAuthorizationService(db)
+    todo = await authorize_todo_access(todo_id, current_user, authorization_service)
+
+    return todo_serializer.response(todo)
+
+
+@todo_router.patch(path="/todos/{todo_id}/completed", tags=["todo"], response_model=TodoResponse,
+                   status_code=status.HTTP_200_OK)
+async def mark_todo_as_completed(todo_id: Annotated[int, Path(ge=1)],
+                                 current_user: Annotated[User, Depends(oauth2_bearer)],
+                                 db: Annotated[AsyncSession, Depends(get_async_write_db)]) -> Response:
+
+    authorization_service = AsyncAuthorizationService(db)
+    todo = await authorize_todo_access(todo_id, current_user, authorization_service)
+
+    rows = await AsyncTodoService(db).set_completed(current_user.username, TodoSelection(ids=[todo_id]), True)
+
+    return todo_serializer.response(rows[0] if rows else todo)
+
+
+@todo_router.patch(path="/todos/{todo_id}/uncompleted", tags=["todo"], response_model=TodoResponse,
+                   status_code=status.HTTP_200_OK)
+async def mark_todo_as_uncompleted(todo_id: Annotated[int, Path(ge=1)],
+                                   current_user: Annotated[User, Depends(oauth2_bearer)],
+                                   db: Annotated[AsyncSession, Depends(get_async_write_db)]) -> Response:
+
+    authorization_service = AsyncAuthorizationService(db)
+    todo = await authorize_todo_access(todo_id, current_user, authorization_service)
+
+    rows = await AsyncTodoService(db).set_completed(current_user.username, TodoSelection(ids=[todo_id]), False)
+
+    return todo_serializer.response(rows[0] if rows else todo)
+
+
+@todo_router.delete(path="/todos/{todo_id}", tags=["todo"], status_code=status.HTTP_204_NO_CONTENT)
+async def delete_todo(todo_id: Annotated[int, Path(ge=1)],
+                      current_user: Annotated[User, Depends(oauth2_bearer)],
+                      db: Annotated[AsyncSession, Depends(get_async_write_db)]) -> Response:
+
+    authorization_service = AsyncAuthorizationService(db)
+    await authorize_todo_access(todo_id, current_user, authorization_service)
+
+    await AsyncTodoService(db).delete_todos(current_user.username, TodoSelection(ids=[todo_id]))
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+async def authorize_selection(selection: TodoSelection, current_user: User, db: AsyncSession) -> None:
+    if selection.list_id is not None:
+        await authorize_list_access(selection.list_id, current_user, AsyncAuthorizationService(db))
+
+
+def bulk_result(rows: list) -> Response:
+    return todo_bulk_serializer.response({"affected": len(rows), "ids": sorted(row.id for row in rows)})
+
+
+@todo_router.post(path="/todos:complete", tags=["todo"], response_model=TodoBulkResult, status_code=status.HTTP_200_OK)
+async def mark_todos_as_completed(selection: TodoSelection,
+                                  current_user: Annotated[User, Depends(oauth2_bearer)],
+                                  db: Annotated[AsyncSession, Depends(get_async_write_db)]) -> Response:
+
+    await authorize_selection(selection, current_user, db)
+    rows = await AsyncTodoService(db).set_completed(current_user.username, selection, True)
+
+    return bulk_result(rows)
+
+
+@todo_router.post(path="/todos:uncomplete", tags=["todo"], response_model=TodoBulkResult,
+                  status_code=status.HTTP_200_OK)
+async def mark_todos_as_uncompleted(selection: TodoSelection,
+                                    current_user: Annotated[User, Depends(oauth2_bearer)],
+                                    db: Annotated[AsyncSession, Depends(get_async_write_db)]) -> Response:
 
+    await authorize_selection(selection, current_user, db)
+    rows = await AsyncTodoService(db).set_completed(current_user.username, selection, False)
 
-# TODO
-@todo_router.patch(path="/todos/{todo_id}/completed", tags=["todo"], status_code=status.HTTP_200_OK,
-                   dependencies=[Depends(jwt_bearer)])
-def mark_todo_as_completed(todo_id: Annotated[int, Path(ge=1)],
-                           current_user: Annotated[User, Depends(oauth2_bearer)],
-                           db: Annotated[Session, Depends(get_db)]) -> JSONResponse:
-    pass
+    return bulk_result(rows)
 
 
-# TODO
-@todo_router.patch(path="/todos/{todo_id}/uncompleted", tags=["todo"], status_code=status.HTTP_200_OK,
-                   dependencies=[Depends(jwt_bearer)])
-def mark_todo_as_uncompleted(todo_id: Annotated[int, Path(ge=1)],
-                             current_user: Annotated[User, Depends(oauth2_bearer)],
-                             db: Annotated[Session, Depends(get_db)]) -> JSONResponse:
-    pass
+@todo_router.post(path="/todos:delete", tags=["todo"], response_model=TodoBulkResult, status_code=status.HTTP_200_OK)
+async def delete_todos(selection: TodoSelection,
+                       current_user: Annotated[User, Depends(oauth2_bearer)],
+                       db: Annotated[AsyncSession, Depends(get_async_write_db)]) -> Response:
 
+    await authorize_selection(selection, current_user, db)
+    rows = await AsyncTodoService(db).delete_todos(current_user.username, selection)
 
-# TODO
-@todo_router.delete(path="/todos/{todo_id}", tags=["todo"], status_code=status.HTTP_204_NO_CONTENT,
-                    dependencies=[Depends(jwt_bearer)])
-def delete_todo(todo_id: Annotated[int, Path(ge=1)],
-                current_user: Annotated[User, Depends(oauth2_bearer)],
-                db: Annotated[Session, Depends(get_db)]) -> JSONResponse:
-    pass
+    return bulk_result(rows)
@@ -1,23 +1,33 @@
-from fastapi import APIRouter, HTTPException, Depends, Path, status, Query
-from fastapi.responses import JSONResponse
-from fastapi.encoders import jsonable_encoder
+from fastapi import Request, Response, APIRouter, HTTPException, Depends, Header, Path, status, Query, UploadFile
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
 
+from starlette.concurrency import run_in_threadpool
+
 from pydantic import SecretStr
 
-from typing import Dict, List, Annotated
+from typing import AsyncIterator, Dict, List, Literal, Tuple, Annotated
 
 
-from config.database import get_db, Session
+from config.database import get_async_db, AsyncSession
+from config.replicas import STICKY_COOKIE, replica_router
 
+from utils.etag import make_etag, etag_matches
 from utils.jwt_handler import sign_jwt
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from utils.responses import todo_lists_serializer, todo_list_summaries_serializer
 
 from schemas.user import UserRegistration, User
-from schemas.list import TodoList
+from schemas.list import TodoListResponse, TodoListSummary
 
-from services.user import UserService
+from services.user import AsyncUserService
+from services.authorization import AsyncAuthorizationService
+from services.cache import payload_cache, user_namespace
+from services.export import AsyncExportService, gzip_stream
+from services.importer import IMPORT_BATCH_SIZE, ImportOwnershipError, ImportUserNotFoundError, run_import
+from services.purge import AsyncPurgeService
 
-from middlewares.auth_handler import oauth2_bearer, jwt_bearer
+from middlewares.auth_handler import oauth2_bearer, get_async_read_db, get_async_write_db
 
 
 user_router = APIRouter()
@@ -25,12 +35,14 @@ user_router = APIRouter()
 
 @user_router.post(path="/users/signup", tags=["user"], response_model=UserRegistration,
                   status_code=status.HTTP_201_CREATED)
-def user_signup(user: Annotated[UserRegistration, Depends()], db: Annotated[Session, Depends(get_db)]) -> JSONResponse:
-    service = UserService(db)
+async def user_signup(user: Annotated[UserRegistration, Depends()],
+                      db: Annotated[AsyncSession, Depends(get_async_db)]) -> ORJSONResponse:
+    service = AsyncUserService(db)
 
-    result = service.get_user_by_username(user.username)
+    if await service.create_user(user):
+        return ORJSONResponse(status_code=status.HTTP_201_CREATED, content=user.model_dump(exclude={"password_hash"}))
 
-    if service.exists_user(result):
+    if service.exists_user(await service.get_user_by_username(user.username)):
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"A user with username {user.username} already exists!",
@@ -39,25 +51,21 @@ def user_signup(user: Annotated[UserRegistration, Depends()], db: Annotated[Sess
             }
         )
 
-    elif service.exists_user_email(user.email):
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail=f"A user with email {user.email} already exists!",
-            headers={
-                "Email-Conflict": user.email
-            }
-        )
-
-    service.create_user(user)
-    return JSONResponse(status_code=status.HTTP_201_CREATED, content=user.model_dump(exclude={"password_hash"}))
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"A user with email {user.email} already exists!",
+        headers={
+            "Email-Conflict": user.email
+        }
+    )
 
 
 @user_router.post(path="/users/login", tags=["user"], response_model=Dict[str, str], status_code=status.HTTP_200_OK)
-def user_login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-               db: Annotated[Session, Depends(get_db)]) -> JSONResponse:
-    service = UserService(db)
+async def user_login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+                     db: Annotated[AsyncSession, Depends(get_async_db)]) -> ORJSONResponse:
+    service = AsyncUserService(db)
 
-    result = service.get_user_by_username(form_data.username)
+    result = await service.get_user_by_username(form_data.username)
 
     if not service.exists_user(result):
         raise HTTPException(
@@ -68,7 +76,7 @@ def user_login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
             }
         )
 
-    if not service.validate_credentials(form_data.username, form_data.password):
+    if not result.active or not await service.validate_credentials(form_data.username, form_data.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password!",
@@ -77,76 +85,265 @@ def user_login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
             }
         )
 
-    return JSONResponse(status_code=status.HTTP_200_OK, content=sign_jwt(form_data.username))
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content=sign_jwt(form_data.username))
 
 
-@user_router.get(path="/users/{user_id}/lists", tags=["user"], response_model=List[TodoList],
-                 dependencies=[Depends(jwt_bearer)])
-def get_lists_for_user(user_id: Annotated[str, Path(max_length=100)],
-                       current_user: Annotated[User, Depends(oauth2_bearer)],
-                       db: Annotated[Session, Depends(get_db)]) -> JSONResponse:
-    service = UserService(db)
+@user_router.get(path="/users/{user_id}/lists", tags=["user"], response_model=List[TodoListResponse])
+async def get_lists_for_user(user_id: Annotated[str, Path(max_length=100)],
+                             current_user: Annotated[User, Depends(oauth2_bearer)],
+                             db: Annotated[AsyncSession, Depends(get_async_read_db)],
+                             limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+                             after: Annotated[str | None, Query(max_length=200)] = None,
+                             completed: Annotated[bool | None, Query()] = None,
+                             if_none_match: Annotated[str | None, Header()] = None) -> Response:
+    authorization_service = AsyncAuthorizationService(db)
 
-    user = service.get_user_by_username(user_id)
+    if not authorization_service.is_owner(user_id, current_user.username):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"The requested user's username does not match the authenticated user's username. Access denied.",
+            headers={
+                "Username-Conflict": user_id
+            }
+        )
 
-    if not service.exists_user(user):
+    service = AsyncUserService(db)
+
+    version = await service.get_lists_version(user_id) or 0
+    etag = make_etag("user-lists", user_id, version, limit, after, completed)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    async def load_lists() -> Tuple[bytes, str | None]:
+        try:
+            lists, next_cursor = await service.get_lists(user_id, limit, after, completed)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid cursor {after}!",
+                headers={
+                    "Cursor-Conflict": after
+                }
+            )
+
+        if not lists and after is None and completed is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Not found any list for user {user_id}!",
+                headers={
+                    "Username-Conflict": user_id
+                }
+            )
+
+        return todo_lists_serializer.dump(lists), next_cursor
+
+    payload, next_cursor = await payload_cache.get_or_load(user_namespace(user_id), repr((limit, after, completed)),
+                                                           version, load_lists)
+
+    headers = {"ETag": etag}
+    if next_cursor is not None:
+        headers["Next-Cursor"] = next_cursor
+    return Response(content=payload, headers=headers, media_type=ORJSONResponse.media_type)
+
+
+@user_router.get(path="/users/{user_id}/lists/summary", tags=["user"], response_model=List[TodoListSummary])
+async def get_list_summaries_for_user(user_id: Annotated[str, Path(max_length=100)],
+                                      current_user: Annotated[User, Depends(oauth2_bearer)],
+                                      db: Annotated[AsyncSession, Depends(get_async_read_db)],
+                                      limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+                                      after: Annotated[str | None, Query(max_length=200)] = None,
+                                      if_none_match: Annotated[str | None, Header()] = None) -> Response:
+
+    if not AsyncAuthorizationService.is_owner(user_id, current_user.username):
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Not found user with username {user_id}!",
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="The requested user's username does not match the authenticated user's username. Access denied.",
             headers={
                 "Username-Conflict": user_id
             }
         )
 
-    if not service.has_same_username(current_user.username, user.username):
+    service = AsyncUserService(db)
+
+    version = await service.get_lists_version(user_id) or 0
+    etag = make_etag("user-list-summaries", user_id, version, limit, after)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    async def load_summaries() -> Tuple[bytes, str | None]:
+        try:
+            summaries, next_cursor = await service.get_list_summaries(user_id, limit, after)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid cursor {after}!",
+                headers={
+                    "Cursor-Conflict": after
+                }
+            )
+
+        return todo_list_summaries_serializer.dump(summaries), next_cursor
+
+    payload, next_cursor = await payload_cache.get_or_load(user_namespace(user_id), repr(("summary", limit, after)),
+                                                           version, load_summaries)
+
+    headers = {"ETag": etag}
+    if next_cursor is not None:
+        headers["Next-Cursor"] = next_cursor
+    return Response(content=payload, headers=headers, media_type=ORJSONResponse.media_type)
+
+
+@user_router.get(path="/users/{user_id}/export", tags=["user"], status_code=status.HTTP_200_OK)
+async def export_user_data(request: Request, user_id: Annotated[str, Path(max_length=100)],
+                           current_user: Annotated[User, Depends(oauth2_bearer)],
+                           export_format: Annotated[Literal["ndjson", "csv"], Query(alias="format")] = "ndjson",
+                           gzip: Annotated[bool, Query()] = False) -> StreamingResponse:
+
+    if not AsyncAuthorizationService.is_owner(user_id, current_user.username):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail=f"The requested user's username does not match the authenticated user's username. Access denied.",
+            detail="The requested user's username does not match the authenticated user's username. Access denied.",
+            headers={
+                "Username-Conflict": user_id
+            }
+        )
+
+    async def export() -> AsyncIterator[bytes]:
+        async with replica_router.read_sessionmaker(user_id, request.cookies.get(STICKY_COOKIE))() as db:
+            service = AsyncExportService(db)
+            chunks = service.export_csv(user_id) if export_format == "csv" else service.export_ndjson(user_id)
+            async for chunk in chunks:
+                yield chunk
+
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    headers = {"Content-Disposition": f'attachment; filename="{user_id}.{export_format}"'}
+
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+        return StreamingResponse(gzip_stream(export()), media_type=media_type, headers=headers)
+
+    return StreamingResponse(export(), media_type=media_type, headers=headers)
+
+
+@user_router.post(path="/users/{user_id}/import", tags=["user"], status_code=status.HTTP_200_OK)
+async def import_user_data(user_id: Annotated[str, Path(max_length=100)],
+                           file: UploadFile,
+                           current_user: Annotated[User, Depends(oauth2_bearer)],
+                           import_id: Annotated[str, Query(min_length=1, max_length=100)],
+                           batch_size: Annotated[int, Query(ge=1, le=10000)] = IMPORT_BATCH_SIZE) -> ORJSONResponse:
+
+    if not AsyncAuthorizationService.is_owner(user_id, current_user.username):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="The requested user's username does not match the authenticated user's username. Access denied.",
             headers={
                 "Username-Conflict": user_id
             }
         )
 
-    if not service.has_any_list(user):
+    try:
+        report = await run_in_threadpool(run_import, file.file, user_id, import_id, batch_size)
+        replica_router.mark_write(user_id)
+    except ImportUserNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Not found any list for user {user_id}!",
+            detail=f"Not found user with username {user_id}!",
             headers={
                 "Username-Conflict": user_id
             }
         )
+    except ImportOwnershipError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"An import with id {import_id} already exists for another user!",
+            headers={
+                "Id-Conflict": import_id
+            }
+        )
 
-    lists: List[TodoList] = service.get_lists(user)
-    return JSONResponse(status_code=status.HTTP_200_OK, content=jsonable_encoder(lists))
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content=report)
 
 
 # TODO
-@user_router.patch(path="/users/{user_id}/change_name", tags=["user"], status_code=status.HTTP_200_OK,
-                   dependencies=[Depends(jwt_bearer)])
-def change_name(user_id: Annotated[str, Path(max_length=100)], new_name: Annotated[str, Path(max_length=100)],
-                current_user: Annotated[User, Depends(oauth2_bearer)]):
-    return JSONResponse(status_code=status.HTTP_200_OK, content={})
+@user_router.patch(path="/users/{user_id}/change_name", tags=["user"], status_code=status.HTTP_200_OK)
+async def change_name(user_id: Annotated[str, Path(max_length=100)], new_name: Annotated[str, Path(max_length=100)],
+                      current_user: Annotated[User, Depends(oauth2_bearer)]):
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content={})
 
 
-# TODO
-@user_router.patch(path="/users/{user_id}/deactivate", tags=["user"], status_code=status.HTTP_200_OK,
-                   dependencies=[Depends(jwt_bearer)])
-def deactivate_account(user_id: Annotated[str, Path(max_length=100)],
-                       current_user: Annotated[User, Depends(oauth2_bearer)]):
+@user_router.patch(path="/users/{user_id}/deactivate", tags=["user"], status_code=status.HTTP_200_OK)
+async def deactivate_account(user_id: Annotated[str, Path(max_length=100)],
+                             current_user: Annotated[User, Depends(oauth2_bearer)],
+                             db: Annotated[AsyncSession, Depends(get_async_write_db)]) -> ORJSONResponse:
+
+    if not AsyncAuthorizationService.is_owner(user_id, current_user.username):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="The requested user's username does not match the authenticated user's username. Access denied.",
+            headers={
+                "Username-Conflict": user_id
+            }
+        )
 
-    return JSONResponse(status_code=status.HTTP_200_OK, content={})
+    service = AsyncUserService(db)
+    user = await service.get_user_by_username(user_id)
+    await service.deactivate(user)
+
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content={"username": user_id, "active": False})
 
 
-# # TODO
 @user_router.patch(path="/users/{user_id}/reactivate", tags=["user"], status_code=status.HTTP_200_OK)
-def reactivate_account(user_id: Annotated[str, Path(max_length=100)],
-                       user_password: Annotated[SecretStr, Query(max_length=255)]):
-    return JSONResponse(status_code=status.HTTP_200_OK, content={})
+async def reactivate_account(user_id: Annotated[str, Path(max_length=100)],
+                             user_password: Annotated[SecretStr, Query(max_length=255)],
+                             db: Annotated[AsyncSession, Depends(get_async_db)]) -> ORJSONResponse:
+    service = AsyncUserService(db)
+    user = await service.get_user_by_username(user_id)
 
+    if not service.exists_user(user):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Not found user with username {user_id}!",
+            headers={
+                "Username-Conflict": user_id
+            }
+        )
 
-# TODO
-@user_router.delete(path="/users/{user_id}", tags=["user"], status_code=status.HTTP_204_NO_CONTENT,
-                    dependencies=[Depends(jwt_bearer)])
-def delete_account(user_id: Annotated[str, Path(max_length=100)],
-                   current_user: Annotated[User, Depends(oauth2_bearer)]):
-    return JSONResponse(status_code=status.HTTP_204_OK, content={})
+    if not await service.validate_credentials(user_id, user_password.get_secret_value()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid username or password!",
+            headers={
+                "Username-Conflict": user_id
+            }
+        )
+
+    if not await service.reactivate(user_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"The account {user_id} is being deleted or its deletion failed!",
+            headers={
+                "Username-Conflict": user_id
+            }
+        )
+
+    return ORJSONResponse(status_code=status.HTTP_200_OK, content={"username": user_id, "active": True})
+
+
+@user_router.delete(path="/users/{user_id}", tags=["user"], status_code=status.HTTP_202_ACCEPTED)
+async def delete_account(user_id: Annotated[str, Path(max_length=100)],
+                         current_user: Annotated[User, Depends(oauth2_bearer)],
+                         db: Annotated[AsyncSession, Depends(get_async_write_db)]) -> ORJSONResponse:
+
+    if not AsyncAuthorizationService.is_owner(user_id, current_user.username):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="The requested user's username does not match the authenticated user's username. Access denied.",
+            headers={
+                "Username-Conflict": user_id
+            }
+        )
+
+    user = await AsyncUserService(db).get_user_by_username(user_id)
+    job = await AsyncPurgeService(db).schedule(user)
+
+    return ORJSONResponse(status_code=status.HTTP_202_ACCEPTED, content={"job_id": job.id, "status": job.status})
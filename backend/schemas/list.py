@@ -1,5 +1,7 @@
 from pydantic import BaseModel, Field, ConfigDict
 
+import datetime
+
 
 class TodoList(BaseModel):
 
@@ -19,16 +21,45 @@ class TodoList(BaseModel):
 
 class TodoListResponse(TodoList):
 
-    registration_time: str = Field()
+    id: int = Field(ge=1)
+
+    registration_time: datetime.datetime = Field()
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
+            "examples": [
+                {
+                    "id": 1,
+                    "name": "My to-do list",
+                    "user_id": "ByJuanDiego",
+                    "registration_time": "2023-08-15T10:44:00"
+                }
+            ]
+        }
+    )
+
+
+class TodoListSummary(TodoListResponse):
+
+    total: int = Field(ge=0)
+
+    completed: int = Field(ge=0)
+
+    pending: int = Field(ge=0)
 
     model_config = ConfigDict(
         from_attributes=True,
         json_schema_extra={
             "examples": [
                 {
+                    "id": 1,
                     "name": "My to-do list",
                     "user_id": "ByJuanDiego",
-                    "registration_time": "2023-08-15T10:44"
+                    "registration_time": "2023-08-15T10:44:00",
+                    "total": 12,
+                    "completed": 3,
+                    "pending": 9
                 }
             ]
         }
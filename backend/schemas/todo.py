@@ -1,4 +1,8 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
+
+from typing import List, Literal
+
+import datetime
 
 
 class Todo(BaseModel):
@@ -20,3 +24,95 @@ class Todo(BaseModel):
                 }
             ]
         })
+
+
+class TodoResponse(Todo):
+
+    id: int = Field(ge=1)
+
+    registration_time: datetime.datetime = Field()
+
+    model_config = ConfigDict(from_attributes=True, json_schema_extra={
+            "examples": [
+                {
+                    "id": 1,
+                    "list_id": 1,
+                    "title": "Dormir más temprano",
+                    "description": "Ya comienza el ciclo y todavía no regulo mi horario de sueño",
+                    "completed": False,
+                    "registration_time": "2023-08-15T10:44:00"
+                }
+            ]
+        })
+
+
+class TodoSearchResult(BaseModel):
+
+    todo: TodoResponse = Field()
+
+    rank: float = Field()
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class TodoBatchItem(BaseModel):
+
+    title: str = Field(max_length=60)
+
+    description: str = Field(max_length=400)
+
+    completed: bool = Field(default=False)
+
+    model_config = ConfigDict(json_schema_extra={
+            "examples": [
+                {
+                    "title": "Comprar pan",
+                    "description": "Antes de las ocho"
+                }
+            ]
+        })
+
+
+class TodoBatchResult(BaseModel):
+
+    index: int = Field(ge=0)
+
+    title: str = Field(max_length=60)
+
+    status: Literal["created", "duplicate"] = Field()
+
+    id: int | None = Field(default=None)
+
+
+class TodoSelection(BaseModel):
+
+    ids: List[int] | None = Field(default=None, min_length=1, max_length=500)
+
+    list_id: int | None = Field(default=None, ge=1)
+
+    completed: bool | None = Field(default=None)
+
+    model_config = ConfigDict(json_schema_extra={
+            "examples": [
+                {
+                    "ids": [1, 2, 3]
+                },
+                {
+                    "list_id": 1,
+                    "completed": True
+                }
+            ]
+        })
+
+    @model_validator(mode="after")
+    def check_selection(self) -> "TodoSelection":
+        if self.ids is None and self.list_id is None:
+            raise ValueError("Either ids or list_id must be given")
+        return self
+
+
+class TodoBulkResult(BaseModel):
+
+    affected: int = Field(ge=0)
+
+    ids: List[int] = Field()
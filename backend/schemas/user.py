@@ -5,6 +5,12 @@ class User(BaseModel):
     username: str = Field(max_length=100)
 
 
+class Principal(User):
+    name: str = Field(max_length=100)
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class UserLogin(User):
     password: SecretStr = Field(max_length=255)
 
@@ -0,0 +1,96 @@
+import json
+import datetime
+import argparse
+
+from typing import Dict
+
+from sqlalchemy import Executable, select, exists, func, text, tuple_
+
+from config.database import engine
+
+from models.user import User as UserModel
+from models.list import TodoList as TodoListModel
+from models.todo import Todo as TodoModel
+
+from services.search import build_search_statement, parse_search_terms
+
+from utils.pagination import DEFAULT_PAGE_SIZE, encode_cursor, paginate
+from utils.upsert import insert_or_ignore
+
+
+def service_queries(username: str, email: str, list_id: int, todo_id: int, title: str) -> Dict[str, Executable]:
+    cursor = encode_cursor(datetime.datetime(2000, 1, 1), 0)
+
+    return {
+        "user_by_username": select(UserModel).where(UserModel.username == username),
+        "user_email_exists": select(exists().where(UserModel.email == email)),
+        "lists_for_user": paginate(select(TodoListModel).filter_by(user_id=username),
+                                   TodoListModel.registration_time, TodoListModel.id, DEFAULT_PAGE_SIZE, None),
+        "lists_for_user_after": paginate(select(TodoListModel).filter_by(user_id=username),
+                                         TodoListModel.registration_time, TodoListModel.id, DEFAULT_PAGE_SIZE, cursor),
+        "list_by_name": select(TodoListModel).filter_by(name=title).limit(1),
+        "todos_for_list": paginate(select(TodoModel).filter_by(list_id=list_id),
+                                   TodoModel.registration_time, TodoModel.id, DEFAULT_PAGE_SIZE, None),
+        "todos_for_list_after": paginate(select(TodoModel).filter_by(list_id=list_id),
+                                         TodoModel.registration_time, TodoModel.id, DEFAULT_PAGE_SIZE, cursor),
+        "pending_todos_for_list": paginate(select(TodoModel).filter_by(list_id=list_id, completed=False),
+                                           TodoModel.registration_time, TodoModel.id, DEFAULT_PAGE_SIZE, None),
+        "todo_by_title_for_list": select(TodoModel).filter(TodoModel.title == title,
+                                                           TodoModel.list_id == list_id).limit(1),
+        "todos_insert_for_batch": insert_or_ignore(engine.dialect.name, TodoModel)
+        .values([{"list_id": list_id, "title": title, "description": title, "completed": False}])
+        .returning(TodoModel.id, TodoModel.title),
+        "todo_keys_for_import": select(TodoModel.list_id, TodoModel.title)
+        .where(tuple_(TodoModel.list_id, TodoModel.title).in_([(list_id, title)])),
+        "todo_with_owner": select(TodoModel, TodoListModel.user_id)
+        .join(TodoListModel, TodoModel.list_id == TodoListModel.id).where(TodoModel.id == todo_id),
+        "export_for_user": select(TodoListModel.id, TodoModel.id)
+        .outerjoin(TodoModel, TodoModel.list_id == TodoListModel.id)
+        .where(TodoListModel.user_id == username).order_by(TodoListModel.id, TodoModel.id),
+        "list_summaries_for_user": select(TodoListModel.id, func.count(TodoModel.id))
+        .outerjoin(TodoModel, TodoModel.list_id == TodoListModel.id).where(TodoListModel.user_id == username)
+        .group_by(TodoListModel.id).order_by(TodoListModel.id).limit(DEFAULT_PAGE_SIZE),
+        "search_todos": build_search_statement(engine.dialect.name, username, parse_search_terms(title),
+                                               DEFAULT_PAGE_SIZE, None)
+    }
+
+
+def explain(statement: Executable, analyze: bool) -> str:
+    sql = str(statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+
+    if engine.dialect.name == "postgresql":
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) " if analyze else "EXPLAIN "
+    else:
+        prefix = "EXPLAIN QUERY PLAN "
+
+    with engine.connect() as connection:
+        rows = connection.execute(text(prefix + sql)).all()
+
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Capture EXPLAIN plans for the queries issued by the services.")
+    parser.add_argument("--username", default="ByJuanDiego")
+    parser.add_argument("--email", default="juancaspadi@gmail.com")
+    parser.add_argument("--list-id", type=int, default=1)
+    parser.add_argument("--todo-id", type=int, default=1)
+    parser.add_argument("--title", default="My to-do list")
+    parser.add_argument("--analyze", action="store_true", help="run EXPLAIN ANALYZE (postgres only)")
+    parser.add_argument("--output", help="also write the plans as JSON, to diff runs before and after a migration")
+    arguments = parser.parse_args()
+
+    queries = service_queries(arguments.username, arguments.email, arguments.list_id, arguments.todo_id,
+                              arguments.title)
+    plans = {name: explain(statement, arguments.analyze) for name, statement in queries.items()}
+
+    for name, plan in plans.items():
+        print(f"== {name}\n{plan}\n")
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(plans, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
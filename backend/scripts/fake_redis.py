@@ -0,0 +1,100 @@
+import time
+import asyncio
+import argparse
+
+from typing import Dict, List, Tuple
+
+
+class FakeRedis:
+
+    def __init__(self) -> None:
+        self.data: Dict[bytes, Tuple[object, float | None]] = {}
+
+    def lookup(self, key: bytes):
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def execute(self, command: List[bytes]) -> bytes:
+        name, arguments = command[0].upper(), command[1:]
+
+        if name in (b"PING", b"AUTH", b"SELECT", b"FLUSHALL"):
+            if name == b"FLUSHALL":
+                self.data.clear()
+            return b"+PONG\r\n" if name == b"PING" else b"+OK\r\n"
+        if name == b"GET":
+            return bulk(self.lookup(arguments[0]))
+        if name == b"SET":
+            self.data[arguments[0]] = (arguments[1], None)
+            return b"+OK\r\n"
+        if name == b"HGET":
+            value = self.lookup(arguments[0])
+            return bulk(value.get(arguments[1]) if isinstance(value, dict) else None)
+        if name == b"HSET":
+            value = self.lookup(arguments[0])
+            if not isinstance(value, dict):
+                value = {}
+                self.data[arguments[0]] = (value, None)
+            added = 0
+            for field, item in zip(arguments[1::2], arguments[2::2]):
+                added += field not in value
+                value[field] = item
+            return b":%d\r\n" % added
+        if name in (b"PEXPIRE", b"EXPIRE"):
+            value = self.lookup(arguments[0])
+            if value is None:
+                return b":0\r\n"
+            seconds = int(arguments[1]) / (1000 if name == b"PEXPIRE" else 1)
+            self.data[arguments[0]] = (value, time.monotonic() + seconds)
+            return b":1\r\n"
+        if name == b"DEL":
+            return b":%d\r\n" % sum(self.data.pop(key, None) is not None for key in arguments)
+
+        return b"-ERR unknown command '%s'\r\n" % name
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = []
+                for _ in range(int(line[1:-2])):
+                    length = int((await reader.readline())[1:-2])
+                    command.append((await reader.readexactly(length + 2))[:-2])
+                writer.write(self.execute(command))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def bulk(value: bytes | None) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+async def serve(host: str, port: int) -> None:
+    server = await asyncio.start_server(FakeRedis().handle, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="In-memory stand-in for the Redis commands used by the cache.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    arguments = parser.parse_args()
+
+    asyncio.run(serve(arguments.host, arguments.port))
+
+
+if __name__ == "__main__":
+    main()
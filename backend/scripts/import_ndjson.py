@@ -0,0 +1,36 @@
+import sys
+import json
+import argparse
+import dataclasses
+
+from config.database import migrate_data_base
+
+from services.importer import IMPORT_BATCH_SIZE, ImportRowError, run_import
+
+
+def print_error(error: ImportRowError) -> None:
+    print(json.dumps(dataclasses.asdict(error)), file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import lists and todos from an NDJSON export.")
+    parser.add_argument("file", help="NDJSON file, as produced by GET /users/{user_id}/export")
+    parser.add_argument("--user", required=True, help="username that will own the imported lists")
+    parser.add_argument("--import-id", help="checkpoint key, reuse it to resume an interrupted import")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    arguments = parser.parse_args()
+
+    import_id = arguments.import_id or f"{arguments.user}:{arguments.file}"
+
+    migrate_data_base()
+
+    with open(arguments.file, "rb") as file:
+        report = run_import(file, arguments.user, import_id, arguments.batch_size, on_error=print_error)
+
+    summary = dataclasses.asdict(report)
+    summary.pop("errors")
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
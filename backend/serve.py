@@ -0,0 +1,229 @@
+import os
+import sys
+import time
+import random
+import signal
+import socket
+import logging
+import argparse
+import multiprocessing
+
+from dataclasses import replace
+from typing import Dict
+
+import uvicorn
+
+import config.workers
+from config.database import database, migrate_data_base
+from config.settings import Settings
+from config.workers import WorkerSlots
+
+
+logger = logging.getLogger("serve")
+
+HEARTBEAT_TICKS = 10
+RESPAWN_BACKOFF = 1.0
+
+
+def worker_settings(settings: Settings, workers: int, connections: int) -> Settings:
+    engine = settings.engine
+    if connections > 0:
+        reserved = 1 if settings.events.backend == "postgres" else 0
+        per_worker = connections // workers - reserved
+        engines = 2 + len(settings.replicas.urls)
+        if per_worker < engines:
+            raise ValueError(f"A budget of {connections} connections cannot give {workers} workers a pool each")
+        engine = engine.for_budget(per_worker, engines)
+    return replace(settings, engine=engine, run_migrations=False)
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+class WorkerServer(uvicorn.Server):
+
+    def __init__(self, config: uvicorn.Config, slots: WorkerSlots, index: int) -> None:
+        super().__init__(config)
+        self.slots: WorkerSlots = slots
+        self.index: int = index
+
+    async def on_tick(self, counter: int) -> bool:
+        if counter % HEARTBEAT_TICKS == 0:
+            self.slots.beat(self.index, self.server_state.total_requests)
+        return await super().on_tick(counter)
+
+
+class Supervisor:
+
+    def __init__(self, app, sock: socket.socket, workers: int, max_requests: int, max_requests_jitter: int,
+                 graceful_timeout: float, timeout: float, log_level: str) -> None:
+        self.app = app
+        self.sock: socket.socket = sock
+        self.workers: int = workers
+        self.max_requests: int = max_requests
+        self.max_requests_jitter: int = max_requests_jitter
+        self.graceful_timeout: float = graceful_timeout
+        self.timeout: float = timeout
+        self.log_level: str = log_level
+        self.slots = WorkerSlots(workers)
+        self.children: Dict[int, int] = {}
+        self.stopping: bool = False
+
+    def spawn(self, index: int) -> None:
+        max_requests = self.max_requests + random.randint(0, self.max_requests_jitter) if self.max_requests else 0
+
+        pid = os.fork()
+        if pid:
+            os.setpgid(pid, pid)
+            self.slots.claim(index, pid, max_requests)
+            self.children[pid] = index
+            return
+
+        code = 0
+        try:
+            self.run_worker(index, max_requests)
+        except BaseException:
+            logger.exception("Worker %s crashed", index)
+            code = 1
+        finally:
+            os._exit(code)
+
+    def run_worker(self, index: int, max_requests: int) -> None:
+        os.setpgid(0, 0)
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        random.seed()
+
+        config.workers.worker_slots = self.slots
+        config.workers.worker_index = index
+
+        server_config = uvicorn.Config(self.app, lifespan="on", log_level=self.log_level,
+                                       limit_max_requests=max_requests or None,
+                                       timeout_graceful_shutdown=self.graceful_timeout)
+        WorkerServer(server_config, self.slots, index).run(sockets=[self.sock])
+
+        for process in multiprocessing.active_children():
+            process.join(self.graceful_timeout)
+            if process.is_alive():
+                process.kill()
+
+    def stop(self, signum, frame) -> None:
+        self.stopping = True
+
+    def reap(self) -> None:
+        while self.children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if not pid:
+                return
+
+            index = self.children.pop(pid, None)
+            if index is None:
+                continue
+
+            uptime = time.time() - self.slots.get(index, "started")
+            self.slots.release(index, restart=not self.stopping)
+            if self.stopping:
+                continue
+
+            logger.info("Worker %s (pid %s) exited with %s after %.1fs, restarting", index, pid,
+                        os.waitstatus_to_exitcode(status), uptime)
+            if uptime < RESPAWN_BACKOFF:
+                time.sleep(RESPAWN_BACKOFF)
+            self.spawn(index)
+
+    def kill_stale(self) -> None:
+        for index in self.slots.stale(self.timeout):
+            pid = int(self.slots.get(index, "pid"))
+            logger.warning("Worker %s (pid %s) missed its heartbeat for %.0fs, killing it", index, pid, self.timeout)
+            self.kill(pid)
+
+    def kill(self, pid: int) -> None:
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def shutdown(self) -> None:
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while self.children and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+
+        for pid in list(self.children):
+            logger.warning("Worker pid %s did not drain in time, killing it", pid)
+            self.kill(pid)
+            os.waitpid(pid, 0)
+            self.children.pop(pid)
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        for index in range(self.workers):
+            self.spawn(index)
+        logger.info("Serving with %s workers on pid %s", self.workers, os.getpid())
+
+        while not self.stopping:
+            self.reap()
+            self.kill_stale()
+            time.sleep(0.5)
+
+        logger.info("Draining %s workers", len(self.children))
+        self.shutdown()
+        self.sock.close()
+
+
+def main() -> None:
+    settings = Settings.from_env()
+
+    parser = argparse.ArgumentParser(description="Run the API with several pre-forked worker processes.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=settings.workers.workers)
+    parser.add_argument("--db-connections", type=int, default=settings.workers.db_connections,
+                        help="connections all workers may open together, 0 keeps the configured pool sizes")
+    parser.add_argument("--max-requests", type=int, default=settings.workers.max_requests,
+                        help="restart a worker after this many requests, 0 disables it")
+    parser.add_argument("--max-requests-jitter", type=int, default=settings.workers.max_requests_jitter)
+    parser.add_argument("--graceful-timeout", type=float, default=settings.workers.graceful_timeout,
+                        help="seconds a worker has to finish in-flight requests on shutdown")
+    parser.add_argument("--timeout", type=float, default=settings.workers.timeout,
+                        help="kill a worker whose event loop has not ticked for this many seconds")
+    parser.add_argument("--log-level", default="info")
+    arguments = parser.parse_args()
+
+    logging.basicConfig(level=arguments.log_level.upper(), format="%(asctime)s [%(process)d] %(message)s")
+
+    if settings.run_migrations:
+        database.configure(settings)
+        migrate_data_base()
+        database.reset()
+
+    try:
+        settings = worker_settings(settings, arguments.workers, arguments.db_connections)
+    except ValueError as e:
+        sys.exit(str(e))
+
+    from main import create_app
+    app = create_app(settings)
+
+    sock = bind_socket(arguments.host, arguments.port)
+    Supervisor(app, sock, arguments.workers, arguments.max_requests, arguments.max_requests_jitter,
+               arguments.graceful_timeout, arguments.timeout, arguments.log_level).run()
+
+
+if __name__ == "__main__":
+    main()
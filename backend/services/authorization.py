@@ -0,0 +1,35 @@
+from typing import Tuple
+
+from sqlalchemy import select
+
+from config.database import AsyncSession
+
+from models.list import TodoList as TodoListModel
+from models.todo import Todo as TodoModel
+
+
+class AsyncAuthorizationService:
+
+    def __init__(self, db: AsyncSession):
+        self.db: AsyncSession = db
+
+    @staticmethod
+    def is_owner(owner: str | None, username: str) -> bool:
+        return owner is not None and owner == username
+
+    async def get_list_with_owner(self, list_id: int) -> Tuple[TodoListModel | None, str | None]:
+        todo_list = await self.db.get(TodoListModel, list_id)
+        if todo_list is None:
+            return None, None
+        return todo_list, todo_list.user_id
+
+    async def get_todo_with_owner(self, todo_id: int) -> Tuple[TodoModel | None, str | None]:
+        statement = (
+            select(TodoModel, TodoListModel.user_id)
+            .join(TodoListModel, TodoModel.list_id == TodoListModel.id)
+            .where(TodoModel.id == todo_id)
+        )
+        row = (await self.db.execute(statement)).first()
+        if row is None:
+            return None, None
+        return row[0], row[1]
@@ -0,0 +1,50 @@
+from typing import List
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
+
+from config.settings import CacheSettings
+
+from utils.cache import CacheBackend, MemoryBackend, RedisBackend, PayloadCache
+
+
+def create_backend(settings: CacheSettings) -> CacheBackend:
+    if settings.backend == "redis":
+        return RedisBackend(settings.redis_url, settings.redis_pool_size, settings.redis_timeout)
+    if settings.backend == "memory":
+        return MemoryBackend(settings.size)
+    return CacheBackend()
+
+
+def configure_cache(settings: CacheSettings) -> None:
+    payload_cache.configure(create_backend(settings), settings.ttl)
+
+
+payload_cache = PayloadCache(create_backend(CacheSettings()), CacheSettings().ttl)
+
+
+def list_namespace(list_id: int) -> str:
+    return f"list-todos:{list_id}"
+
+
+def user_namespace(username: str) -> str:
+    return f"user-lists:{username}"
+
+
+def stage_invalidation(db, namespaces: List[str]) -> None:
+    db.info.setdefault("cache_invalidations", []).extend(namespaces)
+
+
+def stage_principal_invalidation(db, usernames: List[str]) -> None:
+    db.info.setdefault("principal_invalidations", []).extend(usernames)
+
+
+@event.listens_for(OrmSession, "after_commit")
+def invalidate_committed_namespaces(session: OrmSession) -> None:
+    payload_cache.invalidate(session.info.pop("cache_invalidations", []))
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def discard_staged_invalidations(session: OrmSession) -> None:
+    session.info.pop("cache_invalidations", None)
+    session.info.pop("principal_invalidations", None)
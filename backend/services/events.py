@@ -0,0 +1,133 @@
+import json
+import asyncio
+import logging
+
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
+
+from config.database import database
+from config.settings import EventSettings
+
+from utils.broker import EventBroker
+
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "todo_events"
+NOTIFY_MAX_BYTES = 7900
+
+broker = EventBroker(EventSettings().queue_size)
+
+
+def configure_events(settings: EventSettings) -> None:
+    broker.queue_size = settings.queue_size
+
+
+def list_channel(list_id: int) -> str:
+    return f"list:{list_id}"
+
+
+def user_channel(username: str) -> str:
+    return f"user:{username}"
+
+
+def notify_payloads(channel: str, event: dict) -> List[str]:
+    payload = json.dumps({"channel": channel, "event": event})
+    if len(payload.encode()) <= NOTIFY_MAX_BYTES:
+        return [payload]
+
+    field = next((key for key, value in event.items() if isinstance(value, list) and len(value) > 1), None)
+    if field is None:
+        logger.warning("Dropping a %s event on %s, its payload does not fit in a notification", event["type"], channel)
+        return []
+
+    half = len(event[field]) // 2
+    return (notify_payloads(channel, {**event, field: event[field][:half]}) +
+            notify_payloads(channel, {**event, field: event[field][half:]}))
+
+
+def stage_event(db, channel: str, event_type: str, **data) -> None:
+    db.info.setdefault("events", []).append((channel, {"type": event_type, **data}))
+
+
+@event.listens_for(OrmSession, "after_commit")
+def publish_staged_events(session: OrmSession) -> None:
+    events: List[Tuple[str, dict]] = session.info.pop("events", [])
+    if not events:
+        return
+
+    if postgres_fanout.connection is not None:
+        postgres_fanout.notify(events)
+    else:
+        broker.publish(events)
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def discard_staged_events(session: OrmSession) -> None:
+    session.info.pop("events", None)
+
+
+class PostgresFanout:
+
+    def __init__(self) -> None:
+        self.connection = None
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.lock = asyncio.Lock()
+        self.handlers: Dict[str, Callable[[dict], None]] = {}
+
+    def add_handler(self, channel: str, handler: Callable[[dict], None]) -> None:
+        self.handlers[channel] = handler
+
+    async def start(self) -> None:
+        import asyncpg
+
+        self.loop = asyncio.get_running_loop()
+        self.connection = await asyncpg.connect(database.settings.database_url)
+        await self.connection.add_listener(NOTIFY_CHANNEL, self.receive)
+
+    async def stop(self) -> None:
+        if self.connection is not None:
+            connection, self.connection = self.connection, None
+            await connection.close()
+
+    def receive(self, connection, pid: int, channel: str, payload: str) -> None:
+        message = json.loads(payload)
+        handler = self.handlers.get(message["channel"])
+        if handler is not None:
+            handler(message["event"])
+        else:
+            broker.publish([(message["channel"], message["event"])])
+
+    def notify(self, events: List[Tuple[str, dict]]) -> None:
+        payloads = [payload for channel, event in events for payload in notify_payloads(channel, event)]
+        future = asyncio.run_coroutine_threadsafe(self.send(payloads), self.loop)
+        future.add_done_callback(self.log_failure)
+
+    @staticmethod
+    def log_failure(future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("Sending event notifications failed: %r", future.exception())
+
+    async def send(self, payloads: List[str]) -> None:
+        async with self.lock:
+            if self.connection is None:
+                return
+            for payload in payloads:
+                try:
+                    await self.connection.execute("SELECT pg_notify($1, $2)", NOTIFY_CHANNEL, payload)
+                except Exception as e:
+                    logger.warning("Could not send an event notification: %r", e)
+
+
+postgres_fanout = PostgresFanout()
+
+
+async def start_event_fanout(settings: EventSettings) -> None:
+    if settings.backend == "postgres" and database.settings.profile != "sqlite":
+        await postgres_fanout.start()
+
+
+async def stop_event_fanout() -> None:
+    await postgres_fanout.stop()
@@ -0,0 +1,98 @@
+import io
+import csv
+import json
+import zlib
+
+from typing import AsyncIterator, Sequence
+
+from sqlalchemy import Row, select
+
+from config.database import AsyncSession
+
+from models.list import TodoList as TodoListModel
+from models.todo import Todo as TodoModel
+
+
+EXPORT_BATCH_SIZE = 1000
+
+CSV_HEADER = ["list_id", "list_name", "list_registration_time",
+              "todo_id", "title", "description", "completed", "todo_registration_time"]
+
+
+class AsyncExportService:
+
+    def __init__(self, db: AsyncSession):
+        self.db: AsyncSession = db
+
+    async def stream_rows(self, username: str) -> AsyncIterator[Sequence[Row]]:
+        statement = (
+            select(TodoListModel.id, TodoListModel.name, TodoListModel.registration_time,
+                   TodoModel.id, TodoModel.title, TodoModel.description, TodoModel.completed,
+                   TodoModel.registration_time)
+            .outerjoin(TodoModel, TodoModel.list_id == TodoListModel.id)
+            .where(TodoListModel.user_id == username)
+            .order_by(TodoListModel.id, TodoModel.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+
+        result = await self.db.stream(statement)
+        async for partition in result.partitions():
+            yield partition
+
+    async def export_ndjson(self, username: str) -> AsyncIterator[bytes]:
+        current_list_id = None
+
+        async for partition in self.stream_rows(username):
+            lines = []
+
+            for list_id, name, list_time, todo_id, title, description, completed, todo_time in partition:
+                if list_id != current_list_id:
+                    current_list_id = list_id
+                    lines.append(json.dumps({
+                        "type": "list",
+                        "id": list_id,
+                        "name": name,
+                        "registration_time": list_time.isoformat()
+                    }))
+
+                if todo_id is not None:
+                    lines.append(json.dumps({
+                        "type": "todo",
+                        "id": todo_id,
+                        "list_id": list_id,
+                        "title": title,
+                        "description": description,
+                        "completed": completed,
+                        "registration_time": todo_time.isoformat()
+                    }))
+
+            if lines:
+                yield ("\n".join(lines) + "\n").encode()
+
+    async def export_csv(self, username: str) -> AsyncIterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_HEADER)
+
+        async for partition in self.stream_rows(username):
+            for list_id, name, list_time, todo_id, title, description, completed, todo_time in partition:
+                writer.writerow([list_id, name, list_time.isoformat(), todo_id, title, description, completed,
+                                 todo_time.isoformat() if todo_time is not None else None])
+
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+
+    yield compressor.flush()
@@ -0,0 +1,276 @@
+import io
+import csv
+import json
+
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from pydantic import ValidationError
+
+from sqlalchemy import select, insert, tuple_
+from sqlalchemy.exc import IntegrityError
+
+from config.database import Session
+
+from models.user import User as UserModel
+from models.list import TodoList as TodoListModel
+from models.todo import Todo as TodoModel
+from models.import_checkpoint import ImportCheckpoint
+
+from schemas.list import TodoList
+from schemas.todo import Todo
+
+from services.list import bump_versions, bump_user_versions
+from services.events import stage_event, list_channel
+
+
+IMPORT_BATCH_SIZE = 1000
+INSERT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportUserNotFoundError(Exception):
+    pass
+
+
+class ImportOwnershipError(Exception):
+    pass
+
+
+@dataclass
+class ImportRowError:
+    line: int
+    status: str
+    detail: str
+
+
+@dataclass
+class ImportReport:
+    import_id: str
+    resumed_from: int = 0
+    lines: int = 0
+    lists_created: int = 0
+    lists_existing: int = 0
+    todos_created: int = 0
+    conflicts: int = 0
+    invalid: int = 0
+    errors: List[ImportRowError] = field(default_factory=list)
+
+    def add_error(self, error: ImportRowError) -> None:
+        if error.status == "conflict":
+            self.conflicts += 1
+        else:
+            self.invalid += 1
+
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(error)
+
+
+class ImportService:
+
+    def __init__(self, db: Session, username: str, import_id: str, batch_size: int = IMPORT_BATCH_SIZE,
+                 on_error: Callable[[ImportRowError], None] | None = None) -> None:
+        self.db: Session = db
+        self.username: str = username
+        self.import_id: str = import_id
+        self.batch_size: int = batch_size
+        self.on_error = on_error
+
+        self.report = ImportReport(import_id=import_id)
+        self.list_ids: Dict[int, int] = {}
+        self.pending_lists: List[Tuple[int, int, TodoList]] = []
+        self.pending_todos: List[Tuple[int, Todo]] = []
+        self.changed_lists: Dict[int, Tuple[int, int]] = {}
+
+    def load_checkpoint(self) -> ImportCheckpoint:
+        if self.db.get(UserModel, self.username) is None:
+            raise ImportUserNotFoundError(f"Not found user with username {self.username}")
+
+        checkpoint = self.db.get(ImportCheckpoint, self.import_id)
+
+        if checkpoint is None:
+            checkpoint = ImportCheckpoint(id=self.import_id, user_id=self.username, line=0, list_ids="{}")
+            self.db.add(checkpoint)
+            self.db.commit()
+        elif checkpoint.user_id != self.username:
+            raise ImportOwnershipError(f"Import {self.import_id} belongs to another user")
+
+        self.list_ids = {int(source_id): list_id for source_id, list_id in json.loads(checkpoint.list_ids).items()}
+        return checkpoint
+
+    def error(self, line: int, status: str, detail: str) -> None:
+        error = ImportRowError(line=line, status=status, detail=detail)
+        self.report.add_error(error)
+        if self.on_error is not None:
+            self.on_error(error)
+
+    def parse(self, number: int, line: bytes | str) -> None:
+        try:
+            record = json.loads(line)
+            record_type = record.get("type")
+
+            if record_type == "list":
+                todo_list = TodoList(name=record.get("name"), user_id=self.username)
+                self.pending_lists.append((number, int(record["id"]), todo_list))
+            elif record_type == "todo":
+                todo = Todo.model_validate({key: record.get(key) for key in Todo.model_fields if key in record})
+                self.pending_todos.append((number, todo))
+            else:
+                self.error(number, "invalid", f"Unknown record type {record_type}")
+
+        except (ValueError, KeyError, TypeError, AttributeError, ValidationError) as e:
+            self.error(number, "invalid", str(e).splitlines()[0])
+
+    def run(self, lines: Iterable[bytes | str]) -> ImportReport:
+        checkpoint = self.load_checkpoint()
+        self.report.resumed_from = checkpoint.line
+
+        number = 0
+        for number, line in enumerate(lines, start=1):
+            if number <= checkpoint.line or not line.strip():
+                continue
+
+            self.parse(number, line)
+
+            if len(self.pending_lists) + len(self.pending_todos) >= self.batch_size:
+                self.flush(checkpoint, number)
+
+        self.flush(checkpoint, max(number, checkpoint.line))
+        self.report.lines = number
+        return self.report
+
+    def flush(self, checkpoint: ImportCheckpoint, line: int) -> None:
+        if self.pending_lists:
+            self.flush_lists()
+        if self.pending_todos:
+            self.flush_todos()
+
+        if self.changed_lists:
+            bump_versions(self.db, self.changed_lists)
+            for list_id in sorted(self.changed_lists):
+                stage_event(self.db, list_channel(list_id), "todos.imported", list_id=list_id)
+            self.changed_lists = {}
+
+        checkpoint.line = line
+        checkpoint.list_ids = json.dumps(self.list_ids)
+        self.db.commit()
+
+    def flush_lists(self) -> None:
+        names = {todo_list.name for _, _, todo_list in self.pending_lists}
+        existing = {
+            name: (list_id, user_id) for list_id, name, user_id in self.db.execute(
+                select(TodoListModel.id, TodoListModel.name, TodoListModel.user_id)
+                .where(TodoListModel.name.in_(names))
+            )
+        }
+
+        new_lists: Dict[str, List[int]] = {}
+        for number, source_id, todo_list in self.pending_lists:
+            if todo_list.name in existing:
+                list_id, user_id = existing[todo_list.name]
+                if user_id != self.username:
+                    self.error(number, "conflict", f"A list with name {todo_list.name} already exists")
+                    continue
+                self.list_ids[source_id] = list_id
+                self.report.lists_existing += 1
+            elif todo_list.name in new_lists:
+                new_lists[todo_list.name].append(source_id)
+                self.report.lists_existing += 1
+            else:
+                new_lists[todo_list.name] = [source_id]
+
+        if new_lists:
+            statement = insert(TodoListModel).returning(TodoListModel.id, TodoListModel.name)
+            rows = [{"name": name, "user_id": self.username} for name in new_lists]
+            for list_id, name in self.db.execute(statement, rows):
+                for source_id in new_lists[name]:
+                    self.list_ids[source_id] = list_id
+            bump_user_versions(self.db, [self.username])
+            self.report.lists_created += len(new_lists)
+
+        self.pending_lists = []
+
+    def flush_todos(self) -> None:
+        candidates: List[Tuple[int, dict]] = []
+        for number, todo in self.pending_todos:
+            list_id = self.list_ids.get(todo.list_id)
+            if list_id is None:
+                self.error(number, "invalid", f"Unknown list {todo.list_id}")
+                continue
+            candidates.append((number, {**todo.model_dump(), "list_id": list_id}))
+
+        self.pending_todos = []
+        if not candidates:
+            return
+
+        keys = {(row["list_id"], row["title"]) for _, row in candidates}
+        taken = set(self.db.execute(
+            select(TodoModel.list_id, TodoModel.title).where(tuple_(TodoModel.list_id, TodoModel.title).in_(keys))
+        ).tuples())
+
+        rows: List[Tuple[int, dict]] = []
+        for number, row in candidates:
+            key = (row["list_id"], row["title"])
+            if key in taken:
+                self.error(number, "conflict", f"A to-do with title {row['title']} already exists on list "
+                                               f"{row['list_id']}")
+                continue
+            taken.add(key)
+            rows.append((number, row))
+
+        try:
+            with self.db.begin_nested():
+                self.insert_todos([row for _, row in rows])
+            for _, row in rows:
+                self.count_created(row)
+        except (IntegrityError, self.db.get_bind().dialect.dbapi.IntegrityError):
+            self.insert_todos_one_by_one(rows)
+
+    def count_created(self, row: dict) -> None:
+        total, completed = self.changed_lists.get(row["list_id"], (0, 0))
+        self.changed_lists[row["list_id"]] = (total + 1, completed + int(row["completed"]))
+        self.report.todos_created += 1
+
+    def insert_todos(self, rows: List[dict]) -> None:
+        if not rows:
+            return
+
+        bind = self.db.get_bind()
+        if bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2":
+            self.copy_todos(rows)
+            return
+
+        for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+            self.db.execute(insert(TodoModel), rows[start:start + INSERT_CHUNK_SIZE])
+
+    def copy_todos(self, rows: List[dict]) -> None:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([row["list_id"], row["title"], row["description"], row["completed"]])
+        buffer.seek(0)
+
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert("COPY todos (list_id, title, description, completed) FROM STDIN WITH (FORMAT csv)",
+                               buffer)
+        finally:
+            cursor.close()
+
+    def insert_todos_one_by_one(self, rows: List[Tuple[int, dict]]) -> None:
+        for number, row in rows:
+            try:
+                with self.db.begin_nested():
+                    self.db.execute(insert(TodoModel), [row])
+                self.count_created(row)
+            except IntegrityError as e:
+                self.error(number, "conflict", str(e.orig).splitlines()[0])
+
+
+def run_import(lines: Iterable[bytes | str], username: str, import_id: str, batch_size: int = IMPORT_BATCH_SIZE,
+               on_error: Callable[[ImportRowError], None] | None = None) -> ImportReport:
+    db = Session()
+    try:
+        return ImportService(db, username, import_id, batch_size, on_error).run(lines)
+    finally:
+        db.close()
@@ -1,13 +1,58 @@
-from typing import List
+from collections import defaultdict
+from typing import Collection, Dict, List, Tuple
 
-from config.database import Session
+from sqlalchemy import Update, select, exists, update
+
+from config.database import Session, AsyncSession
 
 from models.user import User as UserModel
 from models.list import TodoList as TodoListModel
+from models.todo import Todo as TodoModel
 
 from schemas.list import TodoList
 from schemas.todo import Todo
 
+from services.cache import stage_invalidation, list_namespace, user_namespace
+from services.events import stage_event, user_channel
+
+from utils.pagination import paginate, split_page
+from utils.upsert import insert_or_ignore
+
+
+def list_version_updates(deltas: Dict[int, Tuple[int, int]]) -> List[Update]:
+    groups: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+    for list_id, delta in deltas.items():
+        groups[delta].append(list_id)
+
+    return [
+        update(TodoListModel).where(TodoListModel.id.in_(list_ids))
+        .values(version=TodoListModel.version + 1, todo_count=TodoListModel.todo_count + total,
+                completed_count=TodoListModel.completed_count + completed)
+        .returning(TodoListModel.user_id).execution_options(synchronize_session=False)
+        for (total, completed), list_ids in groups.items()
+    ]
+
+
+def user_lists_version_update(usernames: Collection[str]) -> Update:
+    return (
+        update(UserModel).where(UserModel.username.in_(usernames))
+        .values(lists_version=UserModel.lists_version + 1).execution_options(synchronize_session=False)
+    )
+
+
+def bump_versions(db: Session, deltas: Dict[int, Tuple[int, int]]) -> None:
+    owners = set()
+    for statement in list_version_updates(deltas):
+        owners.update(db.scalars(statement))
+    bump_user_versions(db, owners)
+    stage_invalidation(db, [list_namespace(list_id) for list_id in deltas])
+
+
+def bump_user_versions(db: Session, usernames: Collection[str]) -> None:
+    if usernames:
+        db.execute(user_lists_version_update(usernames))
+        stage_invalidation(db, [user_namespace(username) for username in usernames])
+
 
 class ListService:
 
@@ -25,11 +70,11 @@ class ListService:
     def exists_any_list(todo_lists: List[TodoListModel]) -> bool:
         return len(todo_lists) > 0
 
-    @staticmethod
-    def has_any_todo(todo_list: TodoListModel | None) -> bool:
+    def has_any_todo(self, todo_list: TodoListModel | None) -> bool:
         if todo_list is None:
             return False
-        return len(todo_list.todos) > 0
+        statement = select(exists().where(TodoModel.list_id == todo_list.id))
+        return bool(self.db.scalar(statement))
 
     @staticmethod
     def get_user_for_list(todo_list: TodoListModel | None) -> UserModel | None:
@@ -59,3 +104,77 @@ class ListService:
         new_todo_list = TodoListModel(**todo_list.model_dump())
         self.db.add(new_todo_list)
         self.db.commit()
+
+
+class AsyncListService:
+
+    def __init__(self, database: AsyncSession) -> None:
+        self.db: AsyncSession = database
+
+    @staticmethod
+    def exists_list(todo_list: TodoListModel | None) -> bool:
+        return todo_list is not None
+
+    @staticmethod
+    def exists_any_list(todo_lists: List[TodoListModel]) -> bool:
+        return len(todo_lists) > 0
+
+    async def has_any_todo(self, todo_list: TodoListModel | None) -> bool:
+        if todo_list is None:
+            return False
+        statement = select(exists().where(TodoModel.list_id == todo_list.id))
+        return bool(await self.db.scalar(statement))
+
+    async def get_user_for_list(self, todo_list: TodoListModel | None) -> UserModel | None:
+        if todo_list is None:
+            return None
+        return await self.db.get(UserModel, todo_list.user_id)
+
+    async def get_list_by_id(self, list_id: int) -> TodoListModel | None:
+        todo_list = await self.db.get(TodoListModel, list_id)
+        return todo_list
+
+    async def get_list_by_name(self, list_name: str) -> TodoListModel | None:
+        todo_list = await self.db.scalar(select(TodoListModel).filter_by(name=list_name).limit(1))
+        return todo_list
+
+    async def get_lists(self) -> List[TodoListModel]:
+        lists = await self.db.scalars(select(TodoListModel))
+        return list(lists)
+
+    async def get_todos(self, list_id: int, limit: int, after: str | None = None,
+                        completed: bool | None = None) -> Tuple[List[TodoModel], str | None]:
+        statement = select(TodoModel).filter_by(list_id=list_id)
+
+        if completed is not None:
+            statement = statement.filter_by(completed=completed)
+
+        statement = paginate(statement, TodoModel.registration_time, TodoModel.id, limit, after)
+        todos = await self.db.scalars(statement)
+        return split_page(list(todos), limit)
+
+    async def bump_versions(self, deltas: Dict[int, Tuple[int, int]]) -> None:
+        owners = set()
+        for statement in list_version_updates(deltas):
+            owners.update(await self.db.scalars(statement))
+        await self.bump_user_versions(owners)
+        stage_invalidation(self.db, [list_namespace(list_id) for list_id in deltas])
+
+    async def bump_user_versions(self, usernames: Collection[str]) -> None:
+        if usernames:
+            await self.db.execute(user_lists_version_update(usernames))
+            stage_invalidation(self.db, [user_namespace(username) for username in usernames])
+
+    async def create_list(self, todo_list: TodoList) -> int | None:
+        statement = (
+            insert_or_ignore(self.db.bind.dialect.name, TodoListModel).values(**todo_list.model_dump())
+            .returning(TodoListModel.id)
+        )
+        list_id = await self.db.scalar(statement)
+        if list_id is None:
+            return None
+
+        await self.bump_user_versions([todo_list.user_id])
+        stage_event(self.db, user_channel(todo_list.user_id), "list.created", list_id=list_id, name=todo_list.name)
+        await self.db.commit()
+        return list_id
@@ -0,0 +1,221 @@
+import asyncio
+import datetime
+import logging
+
+from typing import List
+
+from sqlalchemy import Row, select, update, delete, or_
+
+from config.database import AsyncSession
+from config.settings import PurgeSettings
+
+from models.user import User as UserModel
+from models.list import TodoList as TodoListModel
+from models.todo import Todo as TodoModel
+from models.import_checkpoint import ImportCheckpoint
+from models.purge_job import PurgeJob
+
+from services.cache import stage_invalidation, stage_principal_invalidation, list_namespace, user_namespace
+from services.events import stage_event, user_channel
+
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("pending", "running")
+UNFINISHED_STATUSES = ACTIVE_STATUSES + ("failed",)
+
+
+def utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.UTC).replace(tzinfo=None, microsecond=0)
+
+
+class AsyncPurgeService:
+
+    def __init__(self, db: AsyncSession):
+        self.db: AsyncSession = db
+
+    async def get_active_job(self, username: str) -> PurgeJob | None:
+        statement = (
+            select(PurgeJob).where(PurgeJob.user_id == username, PurgeJob.status.in_(ACTIVE_STATUSES))
+            .order_by(PurgeJob.id).limit(1)
+        )
+        return await self.db.scalar(statement)
+
+    async def schedule(self, user: UserModel) -> PurgeJob:
+        job = await self.get_active_job(user.username)
+        if job is not None:
+            return job
+
+        user.active = False
+        job = PurgeJob(user_id=user.username, status="pending", attempts=0, lists_deleted=0, todos_deleted=0)
+        self.db.add(job)
+        stage_event(self.db, user_channel(user.username), "user.deleted", username=user.username)
+        await self.db.commit()
+
+        purge_worker.notify()
+        return job
+
+
+class PurgeWorker:
+
+    def __init__(self, settings: PurgeSettings) -> None:
+        self.configure(settings)
+        self.task: asyncio.Task | None = None
+        self.wakeup: asyncio.Event | None = None
+        self.current_job: int | None = None
+        self.completed: int = 0
+        self.failed: int = 0
+        self.retried: int = 0
+        self.lists_deleted: int = 0
+        self.todos_deleted: int = 0
+
+    def configure(self, settings: PurgeSettings) -> None:
+        self.chunk_size: int = settings.chunk_size
+        self.chunk_pause: float = settings.chunk_pause
+        self.poll_interval: float = settings.poll_interval
+        self.lease: datetime.timedelta = datetime.timedelta(seconds=settings.lease_seconds)
+        self.max_attempts: int = settings.max_attempts
+
+    def notify(self) -> None:
+        if self.wakeup is not None:
+            self.wakeup.set()
+
+    async def claim(self) -> Row | None:
+        now = utcnow()
+        claimable = (PurgeJob.status.in_(ACTIVE_STATUSES),
+                     or_(PurgeJob.locked_until.is_(None), PurgeJob.locked_until < now))
+        candidate = select(PurgeJob.id).where(*claimable).order_by(PurgeJob.id).limit(1).scalar_subquery()
+
+        statement = (
+            update(PurgeJob).where(PurgeJob.id == candidate, *claimable)
+            .values(status="running", attempts=PurgeJob.attempts + 1, locked_until=now + self.lease)
+            .returning(PurgeJob.id, PurgeJob.user_id, PurgeJob.attempts)
+            .execution_options(synchronize_session=False)
+        )
+
+        async with AsyncSession() as db:
+            job = (await db.execute(statement)).first()
+            await db.commit()
+        return job
+
+    async def purge_chunk(self, job: Row) -> bool:
+        owned_lists = select(TodoListModel.id).where(TodoListModel.user_id == job.user_id)
+        todo_chunk = select(TodoModel.id).where(TodoModel.list_id.in_(owned_lists)).limit(self.chunk_size)
+        list_chunk = owned_lists.limit(self.chunk_size)
+
+        async with AsyncSession() as db:
+            result = await db.execute(delete(TodoModel).where(TodoModel.id.in_(todo_chunk))
+                                      .execution_options(synchronize_session=False))
+            todos_deleted, lists_deleted, done = result.rowcount, 0, False
+
+            if not todos_deleted:
+                list_ids: List[int] = list(await db.scalars(
+                    delete(TodoListModel).where(TodoListModel.id.in_(list_chunk)).returning(TodoListModel.id)
+                    .execution_options(synchronize_session=False)
+                ))
+                lists_deleted = len(list_ids)
+                stage_invalidation(db, [list_namespace(list_id) for list_id in list_ids])
+
+            if not todos_deleted and not lists_deleted:
+                await db.execute(delete(ImportCheckpoint).where(ImportCheckpoint.user_id == job.user_id)
+                                 .execution_options(synchronize_session=False))
+                await db.execute(delete(UserModel).where(UserModel.username == job.user_id)
+                                 .execution_options(synchronize_session=False))
+                stage_invalidation(db, [user_namespace(job.user_id)])
+                stage_principal_invalidation(db, [job.user_id])
+                done = True
+
+            await db.execute(
+                update(PurgeJob).where(PurgeJob.id == job.id)
+                .values(status="done" if done else "running", locked_until=None if done else utcnow() + self.lease,
+                        todos_deleted=PurgeJob.todos_deleted + todos_deleted,
+                        lists_deleted=PurgeJob.lists_deleted + lists_deleted)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+        self.todos_deleted += todos_deleted
+        self.lists_deleted += lists_deleted
+        return done
+
+    async def release(self, job: Row, error: Exception) -> None:
+        failed = job.attempts >= self.max_attempts
+        backoff = datetime.timedelta(seconds=self.poll_interval * 2 ** job.attempts)
+
+        async with AsyncSession() as db:
+            await db.execute(
+                update(PurgeJob).where(PurgeJob.id == job.id)
+                .values(status="failed" if failed else "pending", error=repr(error)[:1000],
+                        locked_until=None if failed else utcnow() + backoff)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+        if failed:
+            self.failed += 1
+        else:
+            self.retried += 1
+
+    async def process(self, job: Row) -> None:
+        self.current_job = job.id
+        try:
+            while not await self.purge_chunk(job):
+                await asyncio.sleep(self.chunk_pause)
+            self.completed += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Purge job %s for user %s failed: %r", job.id, job.user_id, e)
+            await self.release(job, e)
+        finally:
+            self.current_job = None
+
+    async def run(self) -> None:
+        while True:
+            self.wakeup.clear()
+            try:
+                job = await self.claim()
+            except Exception as e:
+                logger.warning("Could not claim a purge job: %r", e)
+                job = None
+
+            if job is not None:
+                try:
+                    await self.process(job)
+                    continue
+                except Exception as e:
+                    logger.warning("Could not release purge job %s: %r", job.id, e)
+
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self) -> None:
+        if self.task is None:
+            self.wakeup = asyncio.Event()
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+            self.wakeup = None
+
+    def statistics(self) -> dict:
+        return {
+            "running": self.task is not None and not self.task.done(),
+            "current_job": self.current_job,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retried": self.retried,
+            "lists_deleted": self.lists_deleted,
+            "todos_deleted": self.todos_deleted
+        }
+
+
+purge_worker = PurgeWorker(PurgeSettings())
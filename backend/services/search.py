@@ -0,0 +1,72 @@
+import re
+
+from typing import List, Tuple
+
+from sqlalchemy import Select, select, func, and_, or_, Float
+
+from config.database import AsyncSession
+
+from models.list import TodoList as TodoListModel
+from models.todo import Todo as TodoModel
+from models.search import search_vector, todos_fts, todos_fts_match
+
+from utils.pagination import encode_rank_cursor, decode_rank_cursor
+
+
+MAX_SEARCH_TERMS = 10
+
+SEARCH_TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def parse_search_terms(query: str) -> List[str]:
+    return SEARCH_TERM_PATTERN.findall(query.lower())[:MAX_SEARCH_TERMS]
+
+
+def build_search_statement(dialect: str, username: str, terms: List[str], limit: int, after: str | None) -> Select:
+    if dialect == "postgresql":
+        tsquery = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+        rank = func.ts_rank_cd(search_vector, tsquery, type_=Float)
+        statement = select(TodoModel, rank.label("rank")).where(search_vector.op("@@")(tsquery))
+    else:
+        # bm25() is lower for better matches, negate it so rank always grows with relevance.
+        rank = -func.bm25(todos_fts_match, 2.0, 1.0, type_=Float)
+        statement = (
+            select(TodoModel, rank.label("rank"))
+            .join(todos_fts, todos_fts.c.rowid == TodoModel.id)
+            .where(todos_fts_match.match(" ".join(f'"{term}"*' for term in terms)))
+        )
+
+    statement = (
+        statement
+        .join(TodoListModel, TodoModel.list_id == TodoListModel.id)
+        .where(TodoListModel.user_id == username)
+    )
+
+    if after is not None:
+        after_rank, after_id = decode_rank_cursor(after)
+        statement = statement.where(or_(rank < after_rank, and_(rank == after_rank, TodoModel.id > after_id)))
+
+    return statement.order_by(rank.desc(), TodoModel.id).limit(limit + 1)
+
+
+class AsyncSearchService:
+
+    def __init__(self, db: AsyncSession):
+        self.db: AsyncSession = db
+
+    async def search_todos(self, username: str, query: str, limit: int,
+                           after: str | None = None) -> Tuple[List[dict], str | None]:
+        terms = parse_search_terms(query)
+        if not terms:
+            return [], None
+
+        statement = build_search_statement(self.db.bind.dialect.name, username, terms, limit, after)
+        rows = (await self.db.execute(statement)).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            todo, rank = rows[-1]
+            next_cursor = encode_rank_cursor(rank, todo.id)
+
+        return [{"todo": todo, "rank": rank} for todo, rank in rows], next_cursor
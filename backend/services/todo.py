@@ -1,6 +1,17 @@
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from sqlalchemy import Row, select, update, delete
+
 from models.todo import Todo as TodoModel
-from schemas.todo import Todo
-from config.database import Session
+from models.list import TodoList as TodoListModel
+from schemas.todo import Todo, TodoBatchItem, TodoBatchResult, TodoSelection
+from config.database import Session, AsyncSession
+
+from services.list import AsyncListService
+from services.events import stage_event, list_channel
+
+from utils.upsert import insert_or_ignore
 
 
 class TodoService:
@@ -21,7 +32,7 @@ class TodoService:
 
     def get_todo_by_title_for_list(self, todo_title: str, todo_list_id: int) -> TodoModel | None:
         todo = self.db.query(TodoModel).filter(
-            (TodoModel.title == todo_title) and (TodoModel.list_id == todo_list_id)
+            TodoModel.title == todo_title, TodoModel.list_id == todo_list_id
         ).first()
         return todo
 
@@ -33,3 +44,136 @@ class TodoService:
     @staticmethod
     def exists_todo(todo_model: TodoModel | None) -> bool:
         return todo_model is not None
+
+
+def selection_filters(username: str, selection: TodoSelection) -> list:
+    owned = select(TodoListModel.id).where(TodoListModel.user_id == username)
+    filters = [TodoModel.list_id.in_(owned)]
+
+    if selection.ids is not None:
+        filters.append(TodoModel.id.in_(selection.ids))
+    if selection.list_id is not None:
+        filters.append(TodoModel.list_id == selection.list_id)
+    if selection.completed is not None:
+        filters.append(TodoModel.completed.is_(selection.completed))
+
+    return filters
+
+
+class AsyncTodoService:
+
+    def __init__(self, db: AsyncSession):
+        self.db: AsyncSession = db
+
+    async def get_todos(self):
+        todos = await self.db.scalars(select(TodoModel))
+        return list(todos)
+
+    async def get_todo_by_id(self, todo_id: int) -> TodoModel | None:
+        todo = await self.db.get(TodoModel, todo_id)
+        return todo
+
+    async def get_todo_by_title_for_list(self, todo_title: str, todo_list_id: int) -> TodoModel | None:
+        todo = await self.db.scalar(
+            select(TodoModel).filter(TodoModel.title == todo_title, TodoModel.list_id == todo_list_id).limit(1)
+        )
+        return todo
+
+    async def create_todo(self, todo: Todo) -> int | None:
+        statement = (
+            insert_or_ignore(self.db.bind.dialect.name, TodoModel).values(**todo.model_dump())
+            .returning(TodoModel.id)
+        )
+        todo_id = await self.db.scalar(statement)
+        if todo_id is None:
+            return None
+
+        await AsyncListService(self.db).bump_versions({todo.list_id: (1, int(todo.completed))})
+        stage_event(self.db, list_channel(todo.list_id), "todo.created", list_id=todo.list_id, todo_id=todo_id)
+        await self.db.commit()
+        return todo_id
+
+    async def create_todos(self, list_id: int, todos: List[TodoBatchItem]) -> List[TodoBatchResult]:
+        rows = {}
+        for todo in todos:
+            rows.setdefault(todo.title, {"list_id": list_id, **todo.model_dump()})
+
+        statement = (
+            insert_or_ignore(self.db.bind.dialect.name, TodoModel).values(list(rows.values()))
+            .returning(TodoModel.id, TodoModel.title)
+        )
+        ids = {title: todo_id for todo_id, title in await self.db.execute(statement)}
+
+        if ids:
+            await AsyncListService(self.db).bump_versions({
+                list_id: (len(ids), sum(1 for title in ids if rows[title]["completed"]))
+            })
+            stage_event(self.db, list_channel(list_id), "todos.created", list_id=list_id,
+                        todo_ids=sorted(ids.values()))
+            await self.db.commit()
+
+        results: List[TodoBatchResult] = []
+        for index, todo in enumerate(todos):
+            todo_id = ids.pop(todo.title, None)
+            if todo_id is None:
+                results.append(TodoBatchResult(index=index, title=todo.title, status="duplicate"))
+            else:
+                results.append(TodoBatchResult(index=index, title=todo.title, status="created", id=todo_id))
+
+        return results
+
+    async def set_completed(self, username: str, selection: TodoSelection, completed: bool) -> List[Row]:
+        statement = (
+            update(TodoModel).where(*selection_filters(username, selection), TodoModel.completed.is_(not completed))
+            .values(completed=completed)
+            .returning(TodoModel.id, TodoModel.list_id, TodoModel.title, TodoModel.description,
+                       TodoModel.completed, TodoModel.registration_time)
+            .execution_options(synchronize_session=False)
+        )
+        rows = list(await self.db.execute(statement))
+
+        changed: Dict[int, List[int]] = defaultdict(list)
+        for row in rows:
+            changed[row.list_id].append(row.id)
+
+        event_type = "completed" if completed else "uncompleted"
+        await self.commit_changes(changed, event_type, {
+            list_id: (0, len(ids) if completed else -len(ids)) for list_id, ids in changed.items()
+        })
+        return rows
+
+    async def delete_todos(self, username: str, selection: TodoSelection) -> List[Row]:
+        statement = (
+            delete(TodoModel).where(*selection_filters(username, selection))
+            .returning(TodoModel.id, TodoModel.list_id, TodoModel.completed)
+            .execution_options(synchronize_session=False)
+        )
+        rows = list(await self.db.execute(statement))
+
+        changed: Dict[int, List[int]] = defaultdict(list)
+        deltas: Dict[int, Tuple[int, int]] = {}
+        for row in rows:
+            changed[row.list_id].append(row.id)
+            total, completed = deltas.get(row.list_id, (0, 0))
+            deltas[row.list_id] = (total - 1, completed - int(row.completed))
+
+        await self.commit_changes(changed, "deleted", deltas)
+        return rows
+
+    async def commit_changes(self, changed: Dict[int, List[int]], event_type: str,
+                             deltas: Dict[int, Tuple[int, int]]) -> None:
+        if not changed:
+            return
+
+        await AsyncListService(self.db).bump_versions(deltas)
+        for list_id, ids in changed.items():
+            if len(ids) == 1:
+                stage_event(self.db, list_channel(list_id), f"todo.{event_type}", list_id=list_id, todo_id=ids[0])
+            else:
+                stage_event(self.db, list_channel(list_id), f"todos.{event_type}", list_id=list_id,
+                            todo_ids=sorted(ids))
+        await self.db.commit()
+
+    @staticmethod
+    def exists_todo(todo_model: TodoModel | None) -> bool:
+        return todo_model is not None
@@ -1,13 +1,24 @@
-from typing import List
+from typing import List, Tuple
+
+from sqlalchemy import Row, select, exists, update, func, case, or_
 
 from models.user import User as UserModel
+from models.list import TodoList as TodoListModel
+from models.todo import Todo as TodoModel
+from models.purge_job import PurgeJob
 
 from schemas.user import UserRegistration
 from schemas.list import TodoList
 
-from config.database import Session
+from config.database import Session, AsyncSession, database
+
+from services.cache import stage_principal_invalidation
+from services.events import stage_event, user_channel
+from services.purge import UNFINISHED_STATUSES
 
-from utils.hash_handler import get_hash, verify_password
+from utils.pagination import paginate, split_page
+from utils.upsert import insert_or_ignore
+from utils.hash_handler import get_hash, verify_password, get_hash_async, verify_and_update_password_async
 
 
 class UserService:
@@ -62,3 +73,132 @@ class UserService:
         new_user = UserModel(**user.model_dump())
         self.db.add(new_user)
         self.db.commit()
+
+
+class AsyncUserService:
+    def __init__(self, db: AsyncSession):
+        self.db: AsyncSession = db
+
+    async def get_user_by_username(self, username: str) -> UserModel | None:
+        user = await self.db.get(UserModel, username)
+        return user
+
+    @staticmethod
+    def exists_user(user: UserModel | None) -> bool:
+        return user is not None
+
+    async def has_any_list(self, user: UserModel | None) -> bool:
+        if user is None:
+            return False
+        statement = select(exists().where(TodoListModel.user_id == user.username))
+        return bool(await self.db.scalar(statement))
+
+    @staticmethod
+    def has_same_username(username1: str, username2: str) -> bool:
+        return username1 == username2
+
+    async def get_lists_version(self, username: str) -> int | None:
+        statement = select(UserModel.lists_version).where(UserModel.username == username)
+        return await self.db.scalar(statement)
+
+    async def get_lists(self, username: str, limit: int, after: str | None = None,
+                        completed: bool | None = None) -> Tuple[List[TodoListModel], str | None]:
+        statement = select(TodoListModel).filter_by(user_id=username)
+
+        if completed is not None:
+            pending = exists().where(TodoModel.list_id == TodoListModel.id, TodoModel.completed.is_(False))
+            if completed:
+                statement = statement.where(exists().where(TodoModel.list_id == TodoListModel.id), ~pending)
+            else:
+                statement = statement.where(pending)
+
+        statement = paginate(statement, TodoListModel.registration_time, TodoListModel.id, limit, after)
+        result = await self.db.scalars(statement)
+        return split_page(list(result), limit)
+
+    async def get_list_summaries(self, username: str, limit: int, after: str | None = None,
+                                 use_counters: bool | None = None) -> Tuple[List[Row], str | None]:
+        if use_counters is None:
+            use_counters = database.settings.list_summary_mode == "counters"
+
+        if use_counters:
+            statement = select(TodoListModel.id, TodoListModel.name, TodoListModel.user_id,
+                               TodoListModel.registration_time, TodoListModel.todo_count.label("total"),
+                               TodoListModel.completed_count.label("completed"),
+                               (TodoListModel.todo_count - TodoListModel.completed_count).label("pending"))
+            statement = paginate(statement.filter_by(user_id=username), TodoListModel.registration_time,
+                                 TodoListModel.id, limit, after)
+        else:
+            page = paginate(select(TodoListModel.id, TodoListModel.name, TodoListModel.user_id,
+                                   TodoListModel.registration_time).filter_by(user_id=username),
+                            TodoListModel.registration_time, TodoListModel.id, limit, after).subquery()
+
+            total = func.count(TodoModel.id)
+            completed = func.coalesce(func.sum(case((TodoModel.completed, 1), else_=0)), 0)
+            statement = (
+                select(page.c.id, page.c.name, page.c.user_id, page.c.registration_time, total.label("total"),
+                       completed.label("completed"), (total - completed).label("pending"))
+                .outerjoin(TodoModel, TodoModel.list_id == page.c.id)
+                .group_by(page.c.id, page.c.name, page.c.user_id, page.c.registration_time)
+                .order_by(page.c.registration_time, page.c.id)
+            )
+
+        result = await self.db.execute(statement)
+        return split_page(list(result), limit)
+
+    async def exists_user_email(self, email: str) -> bool:
+        statement = select(exists().where(UserModel.email == email))
+        return bool(await self.db.scalar(statement))
+
+    async def validate_credentials(self, username: str, plain_password: str) -> bool:
+        user = await self.db.get(UserModel, username)
+
+        if user is None:
+            return False
+        valid, new_hash = await verify_and_update_password_async(plain_password, user.password_hash)
+        if not valid:
+            return False
+
+        if new_hash is not None:
+            user.password_hash = new_hash
+            await self.db.commit()
+
+        return True
+
+    async def deactivate(self, user: UserModel) -> None:
+        if user.active:
+            user.active = False
+            stage_event(self.db, user_channel(user.username), "user.deactivated", username=user.username)
+            await self.db.commit()
+
+    async def reactivate(self, username: str) -> bool:
+        scheduled = exists().where(PurgeJob.user_id == username, PurgeJob.status.in_(UNFINISHED_STATUSES))
+        statement = (
+            update(UserModel).where(UserModel.username == username, ~scheduled).values(active=True)
+            .returning(UserModel.active).execution_options(synchronize_session=False)
+        )
+        reactivated = await self.db.scalar(statement)
+        if reactivated is None:
+            return False
+
+        stage_event(self.db, user_channel(username), "user.activated", username=username)
+        stage_principal_invalidation(self.db, [username])
+        await self.db.commit()
+        return True
+
+    async def create_user(self, user: UserRegistration) -> bool:
+        # One extra lookup so a duplicate signup never pays for the password hash; the insert still guards races.
+        taken = exists().where(or_(UserModel.username == user.username, UserModel.email == user.email))
+        if await self.db.scalar(select(taken)):
+            return False
+
+        password_hash = await get_hash_async(user.password_hash.get_secret_value())
+        user.password_hash = password_hash
+
+        statement = (
+            insert_or_ignore(self.db.bind.dialect.name, UserModel).values(**user.model_dump())
+            .returning(UserModel.username)
+        )
+        created = await self.db.scalar(statement)
+        await self.db.commit()
+        return created is not None
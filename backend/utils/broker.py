@@ -0,0 +1,95 @@
+import asyncio
+import itertools
+import threading
+
+from collections import defaultdict
+from typing import Dict, Iterable, Set, Tuple
+
+
+class Subscription:
+
+    def __init__(self, broker: "EventBroker", channels: Tuple[str, ...], queue_size: int) -> None:
+        self.broker: "EventBroker" = broker
+        self.channels: Tuple[str, ...] = channels
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped: bool = False
+
+    def offer(self, event: dict) -> bool:
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            # A consumer that cannot keep up loses its backlog and gets a final None.
+            self.dropped = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return False
+
+    async def get(self, timeout: float) -> dict | None:
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+class EventBroker:
+
+    def __init__(self, queue_size: int = 100) -> None:
+        self.queue_size: int = queue_size
+        self.subscriptions: Dict[str, Set[Subscription]] = defaultdict(set)
+        self.sequence = itertools.count(1)
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.thread_id: int | None = None
+        self.published: int = 0
+        self.delivered: int = 0
+        self.dropped: int = 0
+
+    def subscribe(self, *channels: str) -> Subscription:
+        self.loop = asyncio.get_running_loop()
+        self.thread_id = threading.get_ident()
+
+        subscription = Subscription(self, channels, self.queue_size)
+        for channel in channels:
+            self.subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        for channel in subscription.channels:
+            subscribers = self.subscriptions.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.subscriptions[channel]
+
+    def publish(self, events: Iterable[Tuple[str, dict]]) -> None:
+        events = list(events)
+        if self.loop is None or not events:
+            return
+
+        if threading.get_ident() == self.thread_id:
+            self.deliver(events)
+        elif not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.deliver, events)
+
+    def deliver(self, events: Iterable[Tuple[str, dict]]) -> None:
+        for channel, event in events:
+            self.published += 1
+            event = {**event, "id": next(self.sequence)}
+
+            for subscription in list(self.subscriptions.get(channel, ())):
+                if subscription.offer(event):
+                    self.delivered += 1
+                else:
+                    self.dropped += 1
+                    self.unsubscribe(subscription)
+
+    def statistics(self) -> dict:
+        return {
+            "channels": len(self.subscriptions),
+            "subscriptions": sum(len(subscribers) for subscribers in self.subscriptions.values()),
+            "queue_size": self.queue_size,
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped
+        }
@@ -0,0 +1,302 @@
+import time
+import asyncio
+import threading
+
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, List, Set, Tuple
+from urllib.parse import urlparse
+
+from utils.metrics import Counter, registry
+
+
+cache_requests = registry.register(Counter(
+    "cache_requests_total", "Payload cache lookups, by cache and result.", ("cache", "result")
+))
+cache_invalidations = registry.register(Counter(
+    "cache_invalidations_total", "Payload cache namespaces invalidated, by cache.", ("cache",)
+))
+
+
+class CacheBackend:
+    name = "none"
+
+    async def get(self, namespace: str, field: str) -> bytes | None:
+        return None
+
+    async def set(self, namespace: str, field: str, value: bytes, ttl: float) -> None:
+        pass
+
+    async def delete(self, namespaces: List[str]) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    def statistics(self) -> dict:
+        return {}
+
+
+class MemoryBackend(CacheBackend):
+    name = "memory"
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize: int = maxsize
+        self._entries: OrderedDict[Tuple[str, str], Tuple[float, bytes]] = OrderedDict()
+        self._namespaces: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    async def get(self, namespace: str, field: str) -> bytes | None:
+        key = (namespace, field)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    async def set(self, namespace: str, field: str, value: bytes, ttl: float) -> None:
+        key = (namespace, field)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            self._namespaces.setdefault(namespace, set()).add(field)
+
+            while len(self._entries) > self.maxsize:
+                oldest, _ = next(iter(self._entries.items()))
+                self._remove(oldest)
+
+    async def delete(self, namespaces: List[str]) -> None:
+        self.discard(namespaces)
+
+    def discard(self, namespaces: List[str]) -> None:
+        with self._lock:
+            for namespace in namespaces:
+                for field in self._namespaces.pop(namespace, ()):
+                    self._entries.pop((namespace, field), None)
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        self._entries.pop(key, None)
+        fields = self._namespaces.get(key[0])
+        if fields is not None:
+            fields.discard(key[1])
+            if not fields:
+                del self._namespaces[key[0]]
+
+    def statistics(self) -> dict:
+        return {"size": len(self._entries), "maxsize": self.maxsize, "namespaces": len(self._namespaces)}
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisConnection:
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader: asyncio.StreamReader = reader
+        self.writer: asyncio.StreamWriter = writer
+
+    @staticmethod
+    def encode(*arguments: bytes | str | int | float) -> bytes:
+        parts = [b"*%d\r\n" % len(arguments)]
+        for argument in arguments:
+            if not isinstance(argument, bytes):
+                argument = str(argument).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(argument), argument))
+        return b"".join(parts)
+
+    async def read_reply(self):
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+
+        prefix, body = line[:1], line[1:-2]
+        if prefix == b"+":
+            return body
+        if prefix == b"-":
+            raise RedisError(body.decode())
+        if prefix == b":":
+            return int(body)
+        if prefix == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = await self.reader.readexactly(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            length = int(body)
+            if length < 0:
+                return None
+            return [await self.read_reply() for _ in range(length)]
+        raise RedisError(f"Unexpected reply {line!r}")
+
+    async def execute(self, *commands: Tuple) -> list:
+        self.writer.write(b"".join(self.encode(*command) for command in commands))
+        await self.writer.drain()
+        return [await self.read_reply() for _ in commands]
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class RedisBackend(CacheBackend):
+    name = "redis"
+
+    def __init__(self, url: str, pool_size: int = 10, timeout: float = 1.0, prefix: str = "todo:") -> None:
+        parsed = urlparse(url)
+        self.host: str = parsed.hostname or "localhost"
+        self.port: int = parsed.port or 6379
+        self.password: str | None = parsed.password
+        self.database: int = int(parsed.path.lstrip("/") or 0)
+        self.prefix: str = prefix
+        self.pool_size: int = pool_size
+        self.timeout: float = timeout
+        self._idle: List[RedisConnection] = []
+        self._semaphore: asyncio.Semaphore | None = None
+        self.errors: int = 0
+
+    async def connect(self) -> RedisConnection:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+        connection = RedisConnection(reader, writer)
+        setup = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.database:
+            setup.append(("SELECT", self.database))
+        if setup:
+            await connection.execute(*setup)
+        return connection
+
+    async def execute(self, *commands: Tuple) -> list:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.pool_size)
+
+        async with self._semaphore:
+            connection = self._idle.pop() if self._idle else await self.connect()
+            try:
+                replies = await asyncio.wait_for(connection.execute(*commands), self.timeout)
+            except (ConnectionError, OSError, asyncio.IncompleteReadError):
+                connection.close()
+                raise
+            self._idle.append(connection)
+            return replies
+
+    async def get(self, namespace: str, field: str) -> bytes | None:
+        try:
+            [value] = await self.execute(("HGET", self.prefix + namespace, field))
+            return value
+        except (RedisError, ConnectionError, OSError, asyncio.IncompleteReadError):
+            self.errors += 1
+            return None
+
+    async def set(self, namespace: str, field: str, value: bytes, ttl: float) -> None:
+        key = self.prefix + namespace
+        try:
+            await self.execute(("HSET", key, field, value), ("PEXPIRE", key, int(ttl * 1000)))
+        except (RedisError, ConnectionError, OSError, asyncio.IncompleteReadError):
+            self.errors += 1
+
+    async def delete(self, namespaces: List[str]) -> None:
+        try:
+            await self.execute(("DEL", *(self.prefix + namespace for namespace in namespaces)))
+        except (RedisError, ConnectionError, OSError, asyncio.IncompleteReadError):
+            self.errors += 1
+
+    async def close(self) -> None:
+        while self._idle:
+            self._idle.pop().close()
+
+    def statistics(self) -> dict:
+        return {"host": self.host, "port": self.port, "idle_connections": len(self._idle), "errors": self.errors}
+
+
+class PayloadCache:
+
+    def __init__(self, backend: CacheBackend, ttl: float) -> None:
+        self.backend: CacheBackend = backend
+        self.ttl: float = ttl
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+        self.coalesced: int = 0
+
+    def configure(self, backend: CacheBackend, ttl: float) -> None:
+        if self._inflight:
+            raise RuntimeError("The payload cache cannot be reconfigured while loads are in flight")
+        self.backend = backend
+        self.ttl = ttl
+
+    def record(self, result: str) -> None:
+        cache_requests.inc((self.backend.name, result))
+
+    async def get_or_load(self, namespace: str, field: str, version: int,
+                          loader: Callable[[], Awaitable[Tuple[bytes, str | None]]]) -> Tuple[bytes, str | None]:
+        self.loop = asyncio.get_running_loop()
+
+        cached = await self.backend.get(namespace, field)
+        if cached is not None:
+            cached_version, next_cursor, payload = cached.split(b"\n", 2)
+            if int(cached_version) == version:
+                self.hits += 1
+                self.record("hit")
+                return payload, next_cursor.decode() or None
+
+        key = (namespace, field, version)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            self.record("coalesced")
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                return await loader()
+
+        self.misses += 1
+        self.record("miss")
+        future = self.loop.create_future()
+        self._inflight[key] = future
+
+        try:
+            payload, next_cursor = await loader()
+            entry = b"%d\n%s\n%s" % (version, (next_cursor or "").encode(), payload)
+            await self.backend.set(namespace, field, entry, self.ttl)
+            future.set_result((payload, next_cursor))
+            return payload, next_cursor
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del self._inflight[key]
+
+    def invalidate(self, namespaces: List[str]) -> None:
+        if not namespaces:
+            return
+        cache_invalidations.inc((self.backend.name,), len(namespaces))
+
+        if isinstance(self.backend, MemoryBackend):
+            self.backend.discard(namespaces)
+        elif self.loop is not None and not self.loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self.backend.delete(namespaces), self.loop)
+
+    def statistics(self) -> dict:
+        return {
+            "backend": self.backend.name,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            **self.backend.statistics()
+        }
@@ -0,0 +1,20 @@
+import zlib
+
+from typing import Any
+
+
+def make_etag(kind: str, key: Any, version: int, *parameters: Any) -> str:
+    tag = f"{kind}-{key}-{version}"
+    if parameters:
+        tag += f"-{zlib.crc32(repr(parameters).encode()):08x}"
+    return f'"{tag}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
@@ -1,12 +1,159 @@
+import time
+import asyncio
+import logging
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Tuple
+
+from dotenv import dotenv_values
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["sha256_crypt"], deprecated="auto")
+from config.settings import HashSettings
+
+logger = logging.getLogger(__name__)
+
+
+class HashQueueFullError(Exception):
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Password hashing queue is full")
+        self.retry_after: int = retry_after
+
+
+class HashMetrics:
+
+    def __init__(self) -> None:
+        self.queue_depth: int = 0
+        self.queue_depth_max: int = 0
+        self.rejected: int = 0
+        self.restarts: int = 0
+        self.count: int = 0
+        self.seconds_total: float = 0.0
+        self.seconds_max: float = 0.0
+
+    def record(self, elapsed: float) -> None:
+        self.count += 1
+        self.seconds_total += elapsed
+        self.seconds_max = max(self.seconds_max, elapsed)
+
+    def statistics(self) -> dict:
+        return {
+            "pool_size": get_hash_settings().pool_size,
+            "queue_size": get_hash_settings().queue_size,
+            "queue_depth": self.queue_depth,
+            "queue_depth_max": self.queue_depth_max,
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+            "count": self.count,
+            "seconds_total": self.seconds_total,
+            "seconds_max": self.seconds_max
+        }
+
+
+hash_metrics = HashMetrics()
+
+_hash_settings: HashSettings | None = None
+_pwd_context: CryptContext | None = None
+_executor: ProcessPoolExecutor | None = None
+
+
+def create_context(rounds: int | None) -> CryptContext:
+    if rounds is None:
+        return CryptContext(schemes=["sha256_crypt"], deprecated="auto")
+    return CryptContext(schemes=["sha256_crypt"], deprecated="auto", sha256_crypt__default_rounds=rounds,
+                        sha256_crypt__min_rounds=rounds, sha256_crypt__max_rounds=rounds)
+
+
+def configure_hasher(settings: HashSettings) -> None:
+    global _hash_settings, _pwd_context
+    if _executor is not None and settings != _hash_settings:
+        raise RuntimeError("The password hashing pool was already started with other settings")
+    _hash_settings = settings
+    _pwd_context = create_context(settings.rounds)
+
+
+def get_hash_settings() -> HashSettings:
+    if _hash_settings is None:
+        configure_hasher(HashSettings.from_secrets(dotenv_values("./utils/.env")))
+    return _hash_settings
+
+
+def get_pwd_context() -> CryptContext:
+    if _pwd_context is None:
+        get_hash_settings()
+    return _pwd_context
 
 
 def get_hash(string: str) -> str:
-    string_hash: str = pwd_context.hash(string)
+    string_hash: str = get_pwd_context().hash(string)
     return string_hash
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, str | None]:
+    return get_pwd_context().verify_and_update(plain_password, hashed_password)
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=get_hash_settings().pool_size)
+    return _executor
+
+
+async def warm_up_executor() -> None:
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    await asyncio.gather(*(loop.run_in_executor(executor, get_hash, "warm-up")
+                           for _ in range(get_hash_settings().pool_size)))
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def replace_broken_executor(executor: ProcessPoolExecutor) -> None:
+    global _executor
+    if _executor is executor:
+        logger.warning("Password hashing pool is broken, starting a new one")
+        executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        hash_metrics.restarts += 1
+
+
+async def _run_in_pool(function, *args):
+    settings = get_hash_settings()
+    if hash_metrics.queue_depth >= settings.queue_size:
+        hash_metrics.rejected += 1
+        raise HashQueueFullError(settings.retry_after)
+
+    hash_metrics.queue_depth += 1
+    hash_metrics.queue_depth_max = max(hash_metrics.queue_depth_max, hash_metrics.queue_depth)
+    start = time.perf_counter()
+
+    loop = asyncio.get_running_loop()
+    try:
+        executor = get_executor()
+        try:
+            return await loop.run_in_executor(executor, function, *args)
+        except BrokenProcessPool:
+            replace_broken_executor(executor)
+            return await loop.run_in_executor(get_executor(), function, *args)
+    finally:
+        hash_metrics.queue_depth -= 1
+        hash_metrics.record(time.perf_counter() - start)
+
+
+async def get_hash_async(string: str) -> str:
+    return await _run_in_pool(get_hash, string)
+
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, str | None]:
+    return await _run_in_pool(verify_and_update_password, plain_password, hashed_password)
@@ -1,13 +1,45 @@
 import jwt
 import time
 
+from dataclasses import dataclass
+from typing import Dict
+
 from dotenv import dotenv_values
 
-secrets = dotenv_values("./utils/.env")
+from config.engine import read_setting
+
+
+@dataclass(frozen=True)
+class JwtSettings:
+    key: str
+    algorithm: str
+    expiry_time: int
+
+    @classmethod
+    def from_secrets(cls, secrets: Dict[str, str | None]) -> "JwtSettings":
+        key = read_setting(secrets, "KEY", "")
+        if not key:
+            raise ValueError("The JWT signing KEY is not configured")
+        return cls(
+            key=key,
+            algorithm=read_setting(secrets, "ALGORITHM", "HS256"),
+            expiry_time=int(read_setting(secrets, "EXPIRY_TIME", "3600"))
+        )
+
+
+_jwt_settings: JwtSettings | None = None
 
-JWT_KEY = secrets["KEY"]
-JWT_ALGORITHM = secrets["ALGORITHM"]
-JWT_EXPIRY_TIME = int(secrets["EXPIRY_TIME"])
+
+def configure_jwt(settings: JwtSettings) -> None:
+    global _jwt_settings
+    _jwt_settings = settings
+
+
+def get_jwt_settings() -> JwtSettings:
+    global _jwt_settings
+    if _jwt_settings is None:
+        _jwt_settings = JwtSettings.from_secrets(dotenv_values("./utils/.env"))
+    return _jwt_settings
 
 
 def token_response(token: str) -> dict:
@@ -17,23 +49,29 @@ def token_response(token: str) -> dict:
     }
 
 
+def encode_jwt(payload: dict) -> str:
+    settings = get_jwt_settings()
+    return jwt.encode(payload, settings.key, algorithm=settings.algorithm)
+
+
 def sign_jwt(username: str) -> dict:
     payload = {
         "username": username,
-        "expires": time.time() + JWT_EXPIRY_TIME
+        "expires": time.time() + get_jwt_settings().expiry_time
     }
 
-    token: str = jwt.encode(payload, JWT_KEY, algorithm=JWT_ALGORITHM)
+    token: str = encode_jwt(payload)
     return token_response(token=token)
 
 
 def decode_jwt(token: str) -> dict:
     try:
-        decode_token: dict = jwt.decode(token, JWT_KEY, algorithms=[JWT_ALGORITHM])
+        settings = get_jwt_settings()
+        decode_token: dict = jwt.decode(token, settings.key, algorithms=[settings.algorithm])
         return decode_token if decode_token["expires"] >= time.time() else {}
-    except jwt.DecodeError:
+    except jwt.InvalidTokenError:
         return {}
-    except KeyError:
+    except (KeyError, TypeError):
         return {}
 
 
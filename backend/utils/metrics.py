@@ -0,0 +1,225 @@
+import time
+import bisect
+import threading
+
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from sqlalchemy import Engine, event
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+LabelValues = Tuple[str, ...]
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        self.name: str = name
+        self.documentation: str = documentation
+        self.labels: Tuple[str, ...] = tuple(labels)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, labels: LabelValues = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{format_labels(self.labels, labels)} {format_value(value)}" for labels, value in values
+        ]
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, labels: LabelValues = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, labels: LabelValues = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+    def set(self, labels: LabelValues, value: float) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{format_labels(self.labels, labels)} {format_value(value)}" for labels, value in values
+        ]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        super().__init__(name, documentation, labels)
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, labels: LabelValues, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = [(labels, list(series)) for labels, series in self._values.items()]
+
+        lines = self.header()
+        for labels, series in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                bucket = format_labels(self.labels, labels, f'le="{format_value(float(bound))}"')
+                lines.append(f"{self.name}_bucket{bucket} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labels, labels)} {format_value(series[-1])}")
+            lines.append(f"{self.name}_count{format_labels(self.labels, labels)} {cumulative}")
+        return lines
+
+
+class CallbackGauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str],
+                 callback: Callable[[], Iterable[Tuple[LabelValues, float]]]) -> None:
+        super().__init__(name, documentation, labels)
+        self.callback = callback
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{format_labels(self.labels, labels)} {format_value(value)}"
+            for labels, value in self.callback()
+        ]
+
+
+class MetricsRegistry:
+
+    def __init__(self) -> None:
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "Requests handled, by route template and status code.", ("method", "route", "status")
+))
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "Request latency until the last body chunk is sent.", ("method", "route")
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "Requests currently being handled.", ("method",)
+))
+http_response_size = registry.register(Histogram(
+    "http_response_size_bytes", "Response body size.", ("method", "route"), SIZE_BUCKETS
+))
+db_statements_per_request = registry.register(Histogram(
+    "http_request_db_statements", "Database statements issued per request.", ("method", "route"), COUNT_BUCKETS
+))
+db_duration_per_request = registry.register(Histogram(
+    "http_request_db_duration_seconds", "Time spent in database statements per request.", ("method", "route")
+))
+db_statements = registry.register(Counter(
+    "db_statements_total", "Database statements executed, by engine.", ("engine",)
+))
+db_duration = registry.register(Counter(
+    "db_statement_duration_seconds_total", "Time spent in database statements, by engine.", ("engine",)
+))
+
+
+class RequestStatistics:
+    __slots__ = ("db_statements", "db_seconds")
+
+    def __init__(self) -> None:
+        self.db_statements: int = 0
+        self.db_seconds: float = 0.0
+
+
+request_statistics: ContextVar[RequestStatistics | None] = ContextVar("request_statistics", default=None)
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    labels = (name,)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(connection, cursor, statement, parameters, context, executemany) -> None:
+        connection.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(connection, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - connection.info["query_start"].pop()
+        db_statements.inc(labels)
+        db_duration.inc(labels, elapsed)
+
+        statistics = request_statistics.get()
+        if statistics is not None:
+            statistics.db_statements += 1
+            statistics.db_seconds += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context) -> None:
+        if context.connection is not None:
+            starts = context.connection.info.get("query_start")
+            if starts:
+                starts.pop()
@@ -0,0 +1,55 @@
+import json
+import base64
+import datetime
+
+from typing import Any, List, Tuple
+
+from sqlalchemy import Select, tuple_
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(registration_time: datetime.datetime, row_id: int) -> str:
+    raw = json.dumps([registration_time.isoformat(), row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime.datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        registration_time, row_id = json.loads(raw)
+        return datetime.datetime.fromisoformat(registration_time), int(row_id)
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid cursor {cursor}")
+
+
+def encode_rank_cursor(rank: float, row_id: int) -> str:
+    raw = json.dumps([rank, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_rank_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        rank, row_id = json.loads(raw)
+        return float(rank), int(row_id)
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid cursor {cursor}")
+
+
+def paginate(statement: Select, time_column, id_column, limit: int, after: str | None) -> Select:
+    if after is not None:
+        registration_time, row_id = decode_cursor(after)
+        cursor = tuple_(registration_time, row_id, types=[time_column.type, id_column.type])
+        statement = statement.where(tuple_(time_column, id_column) > cursor)
+
+    return statement.order_by(time_column, id_column).limit(limit + 1)
+
+
+def split_page(rows: List[Any], limit: int) -> Tuple[List[Any], str | None]:
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].registration_time, rows[-1].id)
@@ -0,0 +1,35 @@
+from typing import Any, Dict, Generic, List, TypeVar
+
+from fastapi import Response, status
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+
+from schemas.list import TodoListResponse, TodoListSummary
+from schemas.todo import TodoResponse, TodoBatchResult, TodoBulkResult, TodoSearchResult
+
+
+T = TypeVar("T")
+
+
+class ResponseSerializer(Generic[T]):
+
+    def __init__(self, type_: Any) -> None:
+        self.adapter: TypeAdapter[T] = TypeAdapter(type_)
+
+    def dump(self, value: Any) -> bytes:
+        return self.adapter.dump_json(self.adapter.validate_python(value, from_attributes=True))
+
+    def response(self, value: Any, status_code: int = status.HTTP_200_OK,
+                 headers: Dict[str, str] | None = None) -> Response:
+        return Response(content=self.dump(value), status_code=status_code, headers=headers,
+                        media_type=ORJSONResponse.media_type)
+
+
+todo_serializer: ResponseSerializer[TodoResponse] = ResponseSerializer(TodoResponse)
+todos_serializer: ResponseSerializer[List[TodoResponse]] = ResponseSerializer(List[TodoResponse])
+todo_list_serializer: ResponseSerializer[TodoListResponse] = ResponseSerializer(TodoListResponse)
+todo_lists_serializer: ResponseSerializer[List[TodoListResponse]] = ResponseSerializer(List[TodoListResponse])
+todo_list_summaries_serializer: ResponseSerializer[List[TodoListSummary]] = ResponseSerializer(List[TodoListSummary])
+todo_batch_serializer: ResponseSerializer[List[TodoBatchResult]] = ResponseSerializer(List[TodoBatchResult])
+todo_bulk_serializer: ResponseSerializer[TodoBulkResult] = ResponseSerializer(TodoBulkResult)
+todo_search_serializer: ResponseSerializer[List[TodoSearchResult]] = ResponseSerializer(List[TodoSearchResult])
@@ -0,0 +1,8 @@
+from sqlalchemy import Insert
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+def insert_or_ignore(dialect_name: str, table) -> Insert:
+    if dialect_name == "postgresql":
+        return postgresql.insert(table).on_conflict_do_nothing()
+    return sqlite.insert(table).on_conflict_do_nothing()